@@ -0,0 +1,132 @@
+"""
+Engine profile benchmark
+Loads the same synthetic Pokemon through PokeAPILoader under each write
+profile of database.ENGINE_PROFILES, then times PokedexManager queries
+under each read profile (including the in-memory snapshot) with several
+concurrent readers, so the effect of the PRAGMAs on ingestion and query
+latency can be compared
+
+Usage:
+    python benchmark_engine_profiles.py --size 500 --queries 200 --readers 8 --output profiles.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+
+from benchmark_ingestion import FakePokeAPIServer, _percentile
+from database import dispose_engines
+from pokeapi_client import PokeAPIClient
+from pokeapi_loader import PokeAPILoader
+from pokedex_manager import PokedexManager
+
+WRITE_PROFILES = ['safe', 'bulk-load']
+READ_PROFILES = ['safe', 'serving', 'snapshot']
+
+def bench_ingest(server, db_path, profile, size, batch_size):
+    """Load `size` Pokemon into a fresh database with the given profile"""
+    client = PokeAPIClient(server.base_url)
+    loader = PokeAPILoader(db_path, client=client, batch_size=batch_size, verbose=False, profile=profile)
+    result = loader.load_pokemon_range(1, size)
+    return {
+        'benchmark': 'ingest',
+        'profile': profile,
+        'size': size,
+        'loaded': result['loaded'],
+        'elapsed': result['elapsed'],
+        'species_per_second': result['pokemon_per_second'],
+        'db_time': result['db_time']
+    }
+
+def _queries(pokedex):
+    return [
+        ('search_by_type', lambda: pokedex.search_by_type('fire')),
+        ('search_by_types', lambda: pokedex.search_by_types(['fire', 'flying'])),
+        ('search_by_generation', lambda: pokedex.search_by_generation(1)),
+        ('get_pokemon_by_stats', lambda: pokedex.get_pokemon_by_stats(
+            {'attack': (100, 255), 'speed': (90, 255)}, order_by='total', limit=10)),
+        ('get_pokemon_count', pokedex.get_pokemon_count),
+    ]
+
+def bench_queries(db_path, profile, repeats, readers=1):
+    """Run every query `repeats` times per reader thread on a PokedexManager opened with the given profile"""
+    pokedex = PokedexManager(db_path, profile)
+    results = []
+
+    def reader(call):
+        latencies = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - t0)
+        return latencies
+
+    for name, call in _queries(pokedex):
+        with ThreadPoolExecutor(max_workers=readers) as executor:
+            latencies = [latency for result in executor.map(reader, [call] * readers) for latency in result]
+        results.append({
+            'benchmark': f'query.{name}',
+            'profile': profile,
+            'repeats': repeats,
+            'readers': readers,
+            'latency_p50': _percentile(latencies, 50),
+            'latency_p99': _percentile(latencies, 99)
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=300, help='Pokemon loaded per write profile')
+    parser.add_argument('--queries', type=int, default=100, help='repetitions of every query')
+    parser.add_argument('--readers', type=int, default=4, help='concurrent reader threads per query')
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--output', help='write the JSON results to this file')
+    args = parser.parse_args()
+
+    server = FakePokeAPIServer().start()
+    ingest, queries = [], []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Keep the loader's progress output out of the JSON report
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                for profile in WRITE_PROFILES:
+                    db_path = os.path.join(tmp, f'{profile}.db')
+                    ingest.append(bench_ingest(server, db_path, profile, args.size, args.batch_size))
+            # Every read profile queries the same database
+            db_path = os.path.join(tmp, f'{WRITE_PROFILES[-1]}.db')
+            for profile in READ_PROFILES:
+                queries.extend(bench_queries(db_path, profile, args.queries, args.readers))
+            dispose_engines()  # Release the files before the directory is removed
+    finally:
+        server.stop()
+
+    report = {
+        'config': {'size': args.size, 'queries': args.queries, 'readers': args.readers,
+                   'batch_size': args.batch_size},
+        'ingest': ingest,
+        'queries': queries
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    print("\n" + "=" * 66, file=sys.stderr)
+    print(f"{'Ingest':<30} {'Profile':<10} {'Species/s':>10} {'DB time(s)':>12}", file=sys.stderr)
+    for r in ingest:
+        print(f"{'loader.load_pokemon_range':<30} {r['profile']:<10} {r['species_per_second']:>10.1f} "
+              f"{r['db_time']:>12.3f}", file=sys.stderr)
+    print(f"\n{'Query':<30} {'Profile':<10} {'p50(ms)':>10} {'p99(ms)':>12}", file=sys.stderr)
+    for r in queries:
+        print(f"{r['benchmark']:<30} {r['profile']:<10} {r['latency_p50'] * 1000:>10.2f} "
+              f"{r['latency_p99'] * 1000:>12.2f}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Ingestion benchmark against a local fake PokeAPI server
+Serves deterministic synthetic PokeAPI documents with configurable latency and
+error injection, runs PokeAPILoader.load_pokemon_range,
+PokeAPIIntegration.obtenerMultiplesPokemon and
+AsyncPokeAPIIntegration.crearPokedex at several sizes and writes
+machine-readable results that can be compared against a baseline
+
+Usage:
+    python benchmark_ingestion.py --sizes 50 200 --latency 0.02 --output results.json
+    python benchmark_ingestion.py --baseline results.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import redirect_stdout
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from pokeapi_client import PokeAPIClient
+from pokeapi_integration import PokeAPIIntegration, AsyncPokeAPIIntegration
+from pokeapi_loader import PokeAPILoader
+
+TYPES = [
+    'normal', 'fire', 'water', 'electric', 'grass', 'ice', 'fighting', 'poison', 'ground',
+    'flying', 'psychic', 'bug', 'rock', 'ghost', 'dragon', 'dark', 'steel', 'fairy'
+]
+STATS = ['hp', 'attack', 'defense', 'special-attack', 'special-defense', 'speed']
+MOVE_POOL = 900
+ABILITY_POOL = 300
+MOVES_PER_POKEMON = 40
+
+def _ref(endpoint, resource_id, name):
+    return {'name': name, 'url': f"/api/v2/{endpoint}/{resource_id}/"}
+
+def _effect(text):
+    return [{'effect': text, 'short_effect': text, 'language': {'name': 'en'}}]
+
+def _resource_id(key, prefix):
+    """Accept '25' or 'poke-25' style keys"""
+    if key.isdigit():
+        return int(key)
+    if key.startswith(prefix) and key[len(prefix):].isdigit():
+        return int(key[len(prefix):])
+    return None
+
+def synthetic_document(endpoint, key):
+    """Deterministic PokeAPI-shaped document, or None if the resource does not exist"""
+    if endpoint in ('pokemon', 'pokemon-species'):
+        pokemon_id = _resource_id(key, 'poke-')
+        if not pokemon_id:
+            return None
+        rng = random.Random(pokemon_id)
+        name = f"poke-{pokemon_id}"
+        if endpoint == 'pokemon-species':
+            return {
+                'id': pokemon_id,
+                'name': name,
+                'is_legendary': pokemon_id % 50 == 0,
+                'is_mythical': pokemon_id % 97 == 0,
+                'is_baby': pokemon_id % 31 == 0,
+                'generation': _ref('generation', pokemon_id // 151 + 1, f"generation-{pokemon_id // 151 + 1}"),
+                'habitat': _ref('pokemon-habitat', 1, 'grassland')
+            }
+        types = rng.sample(range(len(TYPES)), rng.choice((1, 2)))
+        return {
+            'id': pokemon_id,
+            'name': name,
+            'height': rng.randint(2, 40),
+            'weight': rng.randint(10, 2000),
+            'species': _ref('pokemon-species', pokemon_id, name),
+            'types': [{'slot': slot, 'type': _ref('type', t + 1, TYPES[t])} for slot, t in enumerate(types, 1)],
+            'stats': [{'base_stat': rng.randint(20, 160), 'effort': 0, 'stat': _ref('stat', i + 1, s)}
+                      for i, s in enumerate(STATS)],
+            'abilities': [{'slot': slot, 'is_hidden': False, 'ability': _ref('ability', a, f"ability-{a}")}
+                          for slot, a in enumerate(rng.sample(range(1, ABILITY_POOL + 1), 2), 1)],
+            'moves': [{'move': _ref('move', m, f"move-{m}")}
+                      for m in rng.sample(range(1, MOVE_POOL + 1), MOVES_PER_POKEMON)],
+            'sprites': {'front_default': f"https://example.invalid/{pokemon_id}.png", 'back_default': None}
+        }
+    if endpoint == 'move':
+        move_id = _resource_id(key, 'move-')
+        if not move_id or move_id > MOVE_POOL:
+            return None
+        rng = random.Random(-move_id)
+        return {
+            'id': move_id,
+            'name': f"move-{move_id}",
+            'power': rng.choice((None, 40, 60, 80, 90, 120)),
+            'accuracy': rng.choice((None, 70, 85, 95, 100)),
+            'pp': rng.choice((5, 10, 15, 20, 35)),
+            'type': _ref('type', move_id % len(TYPES) + 1, TYPES[move_id % len(TYPES)]),
+            'effect_entries': _effect(f"Synthetic effect of move {move_id}.")
+        }
+    if endpoint == 'ability':
+        ability_id = _resource_id(key, 'ability-')
+        if not ability_id or ability_id > ABILITY_POOL:
+            return None
+        return {'id': ability_id, 'name': f"ability-{ability_id}",
+                'effect_entries': _effect(f"Synthetic effect of ability {ability_id}.")}
+    return None
+
+class _BenchHTTPServer(ThreadingHTTPServer):
+    request_queue_size = 128  # Concurrent clients open many connections at once
+
+class FakePokeAPIServer:
+    """Local HTTP stand-in for PokeAPI with latency and error injection"""
+
+    def __init__(self, latency=0.0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _BenchHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/api/v2"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _should_fail(self):
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parts = self.path.split('?')[0].strip('/').split('/')
+                endpoint, key = (parts[-2], parts[-1]) if len(parts) >= 4 else (parts[-1], None)
+                with server._lock:
+                    server.calls[endpoint] += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if server._should_fail():
+                    self._send(500, {'detail': 'injected error'})
+                    return
+                document = synthetic_document(endpoint, key) if key else None
+                if document is None:
+                    self._send(404, {'detail': 'Not found.'})
+                else:
+                    self._send(200, document)
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+def _percentile(values, percentile):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+def bench_loader(server, size, workers, batch_size):
+    """Load `size` Pokemon into a fresh database through the fake server"""
+    with tempfile.TemporaryDirectory() as tmp:
+        client = PokeAPIClient(server.base_url)
+        loader = PokeAPILoader(os.path.join(tmp, 'bench.db'), client=client,
+                               max_workers=workers, batch_size=batch_size)
+        result = loader.load_pokemon_range(1, size)
+        loader.engine.dispose()
+    return {
+        'benchmark': 'loader.load_pokemon_range',
+        'size': size,
+        'loaded': result['loaded'],
+        'failed': result['failed'],
+        'elapsed': result['elapsed'],
+        'species_per_second': result['pokemon_per_second'],
+        'latency_p50': result['latency_p50'],
+        'latency_p99': result['latency_p99'],
+        'api_calls': result['api_calls'],
+        'db_time': result['db_time'],
+        'stages': result['stages']
+    }
+
+def bench_integration(server, size, workers):
+    """Fetch `size` species through PokeAPIIntegration without a response cache"""
+    client = PokeAPIClient(server.base_url)
+    api = PokeAPIIntegration(client, max_workers=workers)
+    nombres = [f"poke-{i}" for i in range(1, size + 1)]
+
+    started = time.perf_counter()
+    especies = api.obtenerMultiplesPokemon(nombres)
+    elapsed = time.perf_counter() - started
+    batch_calls = client.calls
+
+    # Per-species latency of single lookups on a cold client
+    latencies = []
+    for nombre in nombres[:min(size, 20)]:
+        single = PokeAPIIntegration(PokeAPIClient(server.base_url), max_workers=workers)
+        t0 = time.perf_counter()
+        single.obtenerPokemonEspecie(nombre)
+        latencies.append(time.perf_counter() - t0)
+
+    return {
+        'benchmark': 'integration.obtenerMultiplesPokemon',
+        'size': size,
+        'loaded': len(especies),
+        'failed': size - len(especies),
+        'elapsed': elapsed,
+        'species_per_second': len(especies) / elapsed if elapsed else 0.0,
+        'latency_p50': _percentile(latencies, 50),
+        'latency_p99': _percentile(latencies, 99),
+        'api_calls': batch_calls,
+        'db_time': 0.0
+    }
+
+def bench_async_integration(server, size, workers):
+    """Build a Pokedex of `size` species through AsyncPokeAPIIntegration"""
+    client = PokeAPIClient(server.base_url)
+    api = AsyncPokeAPIIntegration(client, max_concurrency=max(workers, 64))
+    nombres = [f"poke-{i}" for i in range(1, size + 1)]
+
+    started = time.perf_counter()
+    pokedex = asyncio.run(api.crearPokedex('bench', nombres))
+    elapsed = time.perf_counter() - started
+    api.close()
+    loaded = len(pokedex.listaPokemonEspecie)
+    return {
+        'benchmark': 'async_integration.crearPokedex',
+        'size': size,
+        'loaded': loaded,
+        'failed': size - loaded,
+        'elapsed': elapsed,
+        'species_per_second': loaded / elapsed if elapsed else 0.0,
+        'latency_p50': elapsed,  # All species complete together
+        'latency_p99': elapsed,
+        'api_calls': client.calls,
+        'db_time': 0.0
+    }
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return the benchmarks whose throughput dropped by more than `tolerance`"""
+    previous = {(r['benchmark'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        before = previous.get((result['benchmark'], result['size']))
+        if before and result['species_per_second'] < before['species_per_second'] * (1 - tolerance):
+            regressions.append({
+                'benchmark': result['benchmark'],
+                'size': result['size'],
+                'baseline': before['species_per_second'],
+                'current': result['species_per_second']
+            })
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 500')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--output', help='write the JSON results to this file')
+    parser.add_argument('--baseline', help='previous JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed throughput drop vs baseline')
+    args = parser.parse_args()
+
+    server = FakePokeAPIServer(latency=args.latency, error_rate=args.error_rate).start()
+    results = []
+    try:
+        # Keep the loader's progress output out of the JSON report
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            for size in args.sizes:
+                results.append(bench_loader(server, size, args.workers, args.batch_size))
+                results.append(bench_integration(server, size, args.workers))
+                results.append(bench_async_integration(server, size, args.workers))
+    finally:
+        server.stop()
+
+    report = {
+        'config': {
+            'latency': args.latency,
+            'error_rate': args.error_rate,
+            'workers': args.workers,
+            'batch_size': args.batch_size
+        },
+        'results': results,
+        'server_calls': dict(server.calls)
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['regressions'] = compare_to_baseline(results, json.load(f), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    print("\n" + "=" * 78, file=sys.stderr)
+    print(f"{'Benchmark':<38} {'Size':>5} {'Species/s':>10} {'p50(ms)':>8} {'p99(ms)':>8} {'Calls':>6}",
+          file=sys.stderr)
+    for r in results:
+        print(f"{r['benchmark']:<38} {r['size']:>5} {r['species_per_second']:>10.1f} "
+              f"{r['latency_p50'] * 1000:>8.1f} {r['latency_p99'] * 1000:>8.1f} {r['api_calls']:>6}",
+              file=sys.stderr)
+    if report.get('regressions'):
+        print(f"\n{len(report['regressions'])} regression(s) against the baseline!", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
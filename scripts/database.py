@@ -1,30 +1,82 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, JSON, ForeignKey, Table, Text
+from sqlalchemy import (
+    create_engine, event, select, func, Column, Integer, String, Float, Boolean, JSON, ForeignKey, Table, Text,
+    Index, CheckConstraint
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, column_property, Session
+from contextlib import contextmanager
 import json
+import os
+import threading
 
 Base = declarative_base()
 
+# PokeAPI base stat name -> typed Pokemon column ('total' is the sum of the six)
+STAT_COLUMNS = {
+    'hp': 'stat_hp',
+    'attack': 'stat_attack',
+    'defense': 'stat_defense',
+    'special-attack': 'stat_special_attack',
+    'special-defense': 'stat_special_defense',
+    'speed': 'stat_speed',
+    'total': 'stat_total'
+}
+
+def stat_column_values(atributos):
+    """Typed stat column values for a PokeAPI stats dict (name -> base stat)"""
+    atributos = atributos or {}
+    values = {column: atributos.get(stat) for stat, column in STAT_COLUMNS.items() if stat != 'total'}
+    known = [value for value in values.values() if value is not None]
+    values['stat_total'] = sum(known) if known else None
+    return values
+
 # Association tables for many-to-many relationships
 pokemon_attacks = Table(
     'pokemon_attacks',
     Base.metadata,
     Column('pokemon_id', Integer, ForeignKey('pokemon.id')),
-    Column('attack_id', Integer, ForeignKey('ataque.id'))
+    Column('attack_id', Integer, ForeignKey('ataque.id')),
+    Index('ix_pokemon_attacks_pokemon_attack', 'pokemon_id', 'attack_id'),
+    Index('ix_pokemon_attacks_attack', 'attack_id')
 )
 
 pokemon_abilities = Table(
     'pokemon_abilities',
     Base.metadata,
     Column('pokemon_id', Integer, ForeignKey('pokemon.id')),
-    Column('habilidad_id', Integer, ForeignKey('habilidad.id'))
+    Column('habilidad_id', Integer, ForeignKey('habilidad.id')),
+    Index('ix_pokemon_abilities_pokemon_habilidad', 'pokemon_id', 'habilidad_id'),
+    Index('ix_pokemon_abilities_habilidad', 'habilidad_id')
+)
+
+# Every type of a species in slot order (PokemonEspecie.tipo keeps the primary type)
+pokemon_especie_tipo = Table(
+    'pokemon_especie_tipo',
+    Base.metadata,
+    Column('especie_id', Integer, ForeignKey('pokemon_especie.id'), primary_key=True),
+    Column('slot', Integer, primary_key=True),
+    Column('tipo', String(50), nullable=False),
+    Index('ix_pokemon_especie_tipo_tipo', 'tipo', 'especie_id')
+)
+
+# Ordered team membership (slots 1-6); (pokemon, equipo_id) answers usage queries
+equipo_pokemon = Table(
+    'equipo_pokemon',
+    Base.metadata,
+    Column('equipo_id', Integer, ForeignKey('equipo.id'), primary_key=True),
+    Column('slot', Integer, primary_key=True),
+    Column('pokemon', String(100), nullable=False),
+    CheckConstraint('slot BETWEEN 1 AND 6', name='ck_equipo_pokemon_slot'),
+    Index('ix_equipo_pokemon_pokemon', 'pokemon', 'equipo_id')
 )
 
 pokemon_species = Table(
     'pokemon_species_rel',
     Base.metadata,
     Column('pokemon_id', Integer, ForeignKey('pokemon.id')),
-    Column('especie_id', Integer, ForeignKey('pokemon_especie.id'))
+    Column('especie_id', Integer, ForeignKey('pokemon_especie.id')),
+    Index('ix_pokemon_species_rel_pokemon', 'pokemon_id'),
+    Index('ix_pokemon_species_rel_especie', 'especie_id')
 )
 
 class Ataque(Base):
@@ -66,10 +118,18 @@ class PokemonEspecie(Base):
     habitat = Column(String(100))
     imagen = Column(String(255))
     atributos = Column(JSON)
-    fuerte_contra = Column(JSON)
-    debil_contra = Column(JSON)
+    fuerte_contra = Column(JSON)  # Defensive: {attacking type: multiplier < 1}, 0 = immune
+    debil_contra = Column(JSON)  # Defensive: {attacking type: multiplier > 1}
     cadena_evolucion = Column(JSON)
     
+    __table_args__ = (
+        Index('ix_pokemon_especie_tipo_generacion', 'tipo', 'generacion'),
+        Index('ix_pokemon_especie_generacion', 'generacion'),
+        Index('ix_pokemon_especie_es_legendario', 'es_legendario'),
+        Index('ix_pokemon_especie_es_mitico', 'es_mitico'),
+        Index('ix_pokemon_especie_es_bebe', 'es_bebe'),
+    )
+    
     def __repr__(self):
         return f"<PokemonEspecie(nombre='{self.nombre}', tipo='{self.tipo}')>"
 
@@ -78,18 +138,34 @@ class Pokemon(Base):
     
     id = Column(Integer, primary_key=True)
     id_pokemon = Column(Integer, unique=True)
+    nombre = Column(String(100))  # PokeAPI Pokemon name; forms differ from especie ('charizard-mega-x')
     altura = Column(Float)
     color = Column(String(50))
     atributos = Column(JSON)
     peso = Column(Float)
     lista_habilidades = Column(JSON)
     lista_ataques = Column(JSON)
+    tipos = Column(JSON)
     especie = Column(String(100), ForeignKey('pokemon_especie.nombre'))
+    # Base stats, copied out of atributos so range and sort queries run in SQL
+    stat_hp = Column(Integer)
+    stat_attack = Column(Integer)
+    stat_defense = Column(Integer)
+    stat_special_attack = Column(Integer)
+    stat_special_defense = Column(Integer)
+    stat_speed = Column(Integer)
+    stat_total = Column(Integer)
     
     # Relationships
     ataques = relationship("Ataque", secondary=pokemon_attacks, backref="pokemons")
     habilidades = relationship("Habilidad", secondary=pokemon_abilities, backref="pokemons")
     
+    __table_args__ = (
+        Index('ix_pokemon_especie', 'especie'),
+        Index('ix_pokemon_nombre', 'nombre'),
+        *(Index(f'ix_pokemon_{column}', column) for column in STAT_COLUMNS.values()),
+    )
+    
     def __repr__(self):
         return f"<Pokemon(id_pokemon={self.id_pokemon}, especie='{self.especie}')>"
 
@@ -123,23 +199,160 @@ class Equipo(Base):
     
     id = Column(Integer, primary_key=True)
     nombre = Column(String(100), nullable=False)
-    lista_pokemon = Column(JSON)
+    lista_pokemon = Column(JSON)  # Legacy; members live in equipo_pokemon (migration 6 copied them)
     entrenador_id = Column(Integer, ForeignKey('entrenador.id'))
     fecha_creacion = Column(String(50))
+    # Loaded with the team as a primary-key lookup on equipo_pokemon
+    num_pokemon = column_property(
+        select(func.count()).where(equipo_pokemon.c.equipo_id == id).scalar_subquery()
+    )
+    
+    __table_args__ = (
+        Index('ix_equipo_entrenador_id', 'entrenador_id'),
+    )
     
     def __repr__(self):
         return f"<Equipo(nombre='{self.nombre}', entrenador_id={self.entrenador_id})>"
 
+class IngestionCheckpoint(Base):
+    __tablename__ = 'ingestion_checkpoint'
+    
+    pokemon_id = Column(Integer, primary_key=True)
+    estado = Column(String(20), nullable=False)  # 'loaded' or 'failed'
+    error = Column(Text)
+    intentos = Column(Integer, default=1)
+    actualizado = Column(String(50))
+    
+    __table_args__ = (
+        Index('ix_ingestion_checkpoint_estado', 'estado'),
+    )
+    
+    def __repr__(self):
+        return f"<IngestionCheckpoint(pokemon_id={self.pokemon_id}, estado='{self.estado}')>"
+
+class SchemaVersion(Base):
+    __tablename__ = 'schema_version'
+    
+    version = Column(Integer, primary_key=True)
+    nombre = Column(String(100), nullable=False)
+    aplicada = Column(String(50))
+    
+    def __repr__(self):
+        return f"<SchemaVersion(version={self.version}, nombre='{self.nombre}')>"
+
+class Estadistica(Base):
+    """Counter kept current by the triggers of migration 7 (see migrations._statistics)"""
+    __tablename__ = 'estadistica'
+    
+    grupo = Column(String(30), primary_key=True)  # total, tipo, generacion, estado, tamano_equipo
+    clave = Column(String(100), primary_key=True)
+    valor = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<Estadistica(grupo='{self.grupo}', clave='{self.clave}', valor={self.valor})>"
+
+# Connection profiles: PRAGMAs applied, in order, to every new connection.
+# The journal mode is stored in the database file, so every profile uses WAL
+# and the CLI's loader, query and pokedex engines can share one pokemon.db.
+ENGINE_PROFILES = {
+    # Full durability: fsync on every commit
+    'safe': [
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'FULL'),
+        ('busy_timeout', 5000),
+    ],
+    # Ingestion: WAL, no fsync (a crash may lose the last commits; the checkpoint
+    # table lets the next run redo them), 256 MB page cache, in-memory temp tables
+    'bulk-load': [
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'OFF'),
+        ('cache_size', -256000),
+        ('temp_store', 'MEMORY'),
+        ('busy_timeout', 5000),
+    ],
+    # Read-only lookups: WAL so readers never block the writer, memory-mapped reads
+    'serving': [
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('mmap_size', 268435456),
+        ('cache_size', -64000),
+        ('temp_store', 'MEMORY'),
+        ('busy_timeout', 5000),
+        ('query_only', 'ON'),
+    ],
+}
+
 # Database connection
-def get_database_engine(db_path='pokemon.db'):
-    """Create database engine and return it"""
+def get_database_engine(db_path='pokemon.db', profile='safe'):
+    """Create database engine and return it, with the PRAGMAs of an ENGINE_PROFILES entry"""
+    pragmas = ENGINE_PROFILES[profile]
     engine = create_engine(f'sqlite:///{db_path}', echo=False)
+    
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+    
     return engine
 
-def create_tables(engine):
-    """Create all tables in the database"""
+# Engines shared by every class in the process, keyed by (absolute db path, profile)
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(db_path='pokemon.db', profile='safe'):
+    """Shared engine for a database file and profile, created on first use.
+    
+    Classes opening the same pokemon.db with the same profile reuse one
+    engine and its connection pool instead of creating their own. The
+    'snapshot' profile serves reads from an in-memory copy of the file
+    (see database_snapshot).
+    """
+    if profile == 'snapshot':
+        from database_snapshot import get_snapshot
+        return get_snapshot(db_path).engine
+    key = (db_path if db_path == ':memory:' else os.path.abspath(db_path), profile)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = get_database_engine(db_path, profile)
+        return engine
+
+def dispose_engines():
+    """Close the pooled connections of every shared engine and snapshot (e.g. on exit)"""
+    from database_snapshot import close_snapshots
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+    for engine in engines:
+        engine.dispose()
+    close_snapshots()
+
+@contextmanager
+def session_scope(engine):
+    """Session for one operation: committed on success, rolled back on error, always closed.
+    
+    Objects are not expired on commit, so loaded columns stay readable after
+    the block; relationships that were not loaded inside it are not.
+    """
+    session = Session(bind=engine, expire_on_commit=False)
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def create_tables(engine, verbose=True):
+    """Create all tables in the database and bring existing ones up to the current schema"""
+    from migrations import migrate
     Base.metadata.create_all(engine)
-    print("Database tables created successfully!")
+    migrate(engine, verbose)
+    if verbose:
+        print("Database tables created successfully!")
 
 def get_session(engine):
     """Create and return a database session"""
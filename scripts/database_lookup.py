@@ -0,0 +1,151 @@
+"""
+Database tier for PokeAPIIntegration lookups
+Serves domain models from pokemon.db and writes network results back to it
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from database import (
+    get_engine, session_scope,
+    Pokemon as PokemonRow, PokemonEspecie as EspecieRow, Ataque as AtaqueRow
+)
+from models import PokemonEspecie, Ataque, Habilidad
+
+class DatabaseLookup:
+    """Read species and moves stored by PokeAPILoader as domain models.
+
+    Each read opens a short-lived session on the shared serving engine, so
+    lookups may run from several threads. `guardar()` queues a Pokemon id
+    to be stored by a background PokeAPILoader, which fetches through the
+    same `client` (and therefore mostly hits the response cache).
+    """
+
+    def __init__(self, db_path='pokemon.db', client=None):
+        self.db_path = db_path
+        self.client = client
+        self.engine = get_engine(db_path, 'serving')
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._loader = None
+        self._writer = ThreadPoolExecutor(max_workers=1)  # Single writer owns the loader session
+        self._queued = set()
+        self._lock = threading.Lock()
+
+    def obtenerEspecies(self, nombres: Iterable[str],
+                        crear_ataques: Callable[[List[str]], Sequence[Ataque]]) -> Dict[str, PokemonEspecie]:
+        """Stored species for the given names or ids, keyed by the requested key (lowercase).
+
+        `crear_ataques(nombres)` builds each species' move list from the
+        stored move names (e.g. a lazy list).
+        """
+        claves = {str(nombre).strip().lower() for nombre in nombres}
+        if not claves:
+            return {}
+        ids = [int(clave) for clave in claves if clave.isdigit()]
+        nombres_pokemon = [clave for clave in claves if not clave.isdigit()]
+
+        query = (
+            select(PokemonRow, EspecieRow)
+            .join(EspecieRow, EspecieRow.nombre == PokemonRow.especie, isouter=True)
+            .where(or_(PokemonRow.id_pokemon.in_(ids), PokemonRow.nombre.in_(nombres_pokemon)))
+            .order_by(PokemonRow.id_pokemon)
+        )
+        try:
+            with session_scope(self.engine) as session:
+                filas = session.execute(query).all()
+        except SQLAlchemyError:
+            filas = []  # No database yet
+
+        especies = {}
+        for pokemon, especie in filas:
+            convertida = self._convertir(pokemon, especie, crear_ataques)
+            for clave in (str(pokemon.id_pokemon), pokemon.nombre):
+                if clave in claves and clave not in especies:
+                    especies[clave] = convertida
+        with self._lock:
+            self.hits += len(especies)
+            self.misses += len(claves) - len(especies)
+        return especies
+
+    def obtenerAtaques(self, nombres: Iterable[str]) -> Dict[str, Ataque]:
+        """Stored moves by name"""
+        nombres = list(nombres)
+        if not nombres:
+            return {}
+        try:
+            with session_scope(self.engine) as session:
+                filas = session.execute(select(AtaqueRow).where(AtaqueRow.nombre.in_(nombres))).scalars().all()
+        except SQLAlchemyError:
+            return {}
+        return {
+            fila.nombre: Ataque(
+                nombre=fila.nombre,
+                descripcion=fila.descripcion or "No description",
+                tipo=fila.tipo or "unknown",
+                potencia=fila.potencia,
+                precision=fila.precision,
+                pp=fila.pp
+            )
+            for fila in filas
+        }
+
+    def guardar(self, pokemon_id: int):
+        """Queue a Pokemon fetched from the network to be written to the database"""
+        with self._lock:
+            if pokemon_id in self._queued:
+                return
+            self._queued.add(pokemon_id)
+        self._writer.submit(self._escribir, pokemon_id)
+
+    def esperar(self):
+        """Block until every queued write-back has finished"""
+        self._writer.submit(lambda: None).result()
+
+    def estadisticas(self) -> Dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'writes': self.writes, 'queued': len(self._queued)}
+
+    def close(self):
+        """Finish pending write-backs (the engine is shared and stays open)"""
+        self._writer.shutdown(wait=True)
+
+    def _escribir(self, pokemon_id: int):
+        try:
+            if self._loader is None:
+                from pokeapi_loader import PokeAPILoader
+                self._loader = PokeAPILoader(self.db_path, client=self.client, verbose=False, quiet=True)
+            if self._loader.load_pokemon_species(pokemon_id):
+                with self._lock:
+                    self.writes += 1
+        except Exception as e:
+            print(f"Error storing Pokemon {pokemon_id} in {self.db_path}: {e}")
+
+    def _convertir(self, pokemon: PokemonRow, especie: Optional[EspecieRow],
+                   crear_ataques: Callable[[List[str]], Sequence[Ataque]]) -> PokemonEspecie:
+        """Database rows -> domain model, matching PokeAPIIntegration's conversion"""
+        tipos = pokemon.tipos or ([especie.tipo] if especie is not None and especie.tipo else [pokemon.color])
+        imagen = especie.imagen if especie is not None else None
+        habilidades = [
+            Habilidad(nombre=nombre, descripcion=f"Ability: {nombre}")
+            for nombre in (pokemon.lista_habilidades or [])
+        ]
+        return PokemonEspecie(
+            orden=pokemon.id_pokemon,
+            nombre=pokemon.nombre or pokemon.especie,
+            tipo=tipos,
+            rangoGenero=50.0,  # Default value
+            peso=(pokemon.peso or 0) / 10.0,  # Stored in hectograms
+            altura=(pokemon.altura or 0) / 10.0,  # Stored in decimeters
+            listaHabilidades=habilidades,
+            listaAtaques=crear_ataques(list(pokemon.lista_ataques or [])[:10]),
+            esBebes=bool(especie.es_bebe) if especie is not None else False,
+            esLegendario=bool(especie.es_legendario) if especie is not None else False,
+            esMitico=bool(especie.es_mitico) if especie is not None else False,
+            habitat=(especie.habitat or "") if especie is not None else "",
+            imagen=imagen,
+            fotos=[imagen, None]
+        )
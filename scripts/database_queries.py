@@ -1,34 +1,47 @@
-from database import get_database_engine, get_session, Pokemon, PokemonEspecie, Entrenador, Equipo, Ataque, Habilidad
+from sqlalchemy import func, select
+from database import (
+    get_engine, session_scope, Pokemon, PokemonEspecie, Entrenador, Equipo, Ataque, Habilidad, Estadistica,
+    pokemon_especie_tipo, equipo_pokemon
+)
 
 class DatabaseQueries:
     """Query helper class for Pokemon database"""
     
-    def __init__(self, db_path='pokemon.db'):
-        self.engine = get_database_engine(db_path)
-        self.session = get_session(self.engine)
+    def __init__(self, db_path='pokemon.db', profile='safe', snapshot=False):
+        # Also writes trainers and teams, so it keeps the durable profile
+        self.engine = get_engine(db_path, profile)
+        # Pokedex reads may come from the in-memory snapshot; trainers and teams always use the file
+        self.pokedex_engine = get_engine(db_path, 'snapshot') if snapshot else self.engine
     
     def get_pokemon_by_name(self, nombre):
         """Get Pokemon species by name"""
-        return self.session.query(PokemonEspecie).filter_by(nombre=nombre).first()
+        with session_scope(self.pokedex_engine) as session:
+            return session.query(PokemonEspecie).filter_by(nombre=nombre).first()
     
     def get_pokemon_by_type(self, tipo):
-        """Get all Pokemon of a specific type"""
-        return self.session.query(PokemonEspecie).filter_by(tipo=tipo).all()
+        """Get all Pokemon having a specific type in any slot"""
+        with session_scope(self.pokedex_engine) as session:
+            return session.query(PokemonEspecie).join(
+                pokemon_especie_tipo, pokemon_especie_tipo.c.especie_id == PokemonEspecie.id
+            ).filter(pokemon_especie_tipo.c.tipo == tipo).order_by(PokemonEspecie.id).all()
     
     def get_all_pokemon_species(self, limit=None):
         """Get all Pokemon species"""
-        query = self.session.query(PokemonEspecie)
-        if limit:
-            query = query.limit(limit)
-        return query.all()
+        with session_scope(self.pokedex_engine) as session:
+            query = session.query(PokemonEspecie)
+            if limit:
+                query = query.limit(limit)
+            return query.all()
     
     def get_pokemon_by_generation(self, generation):
         """Get all Pokemon from a specific generation"""
-        return self.session.query(PokemonEspecie).filter_by(generacion=generation).all()
+        with session_scope(self.pokedex_engine) as session:
+            return session.query(PokemonEspecie).filter_by(generacion=generation).all()
     
     def get_trainer(self, nombre_usuario):
         """Get trainer by username"""
-        return self.session.query(Entrenador).filter_by(nombre_usuario=nombre_usuario).first()
+        with session_scope(self.engine) as session:
+            return session.query(Entrenador).filter_by(nombre_usuario=nombre_usuario).first()
     
     def create_trainer(self, nombre_usuario, nombre, ciudad=""):
         """Create a new trainer"""
@@ -38,13 +51,14 @@ class DatabaseQueries:
             ciudad=ciudad,
             es_aprobado=True
         )
-        self.session.add(trainer)
-        self.session.commit()
+        with session_scope(self.engine) as session:
+            session.add(trainer)
         return trainer
     
     def get_trainer_teams(self, trainer_id):
         """Get all teams for a trainer"""
-        return self.session.query(Equipo).filter_by(entrenador_id=trainer_id).all()
+        with session_scope(self.engine) as session:
+            return session.query(Equipo).filter_by(entrenador_id=trainer_id).all()
     
     def create_team(self, nombre, entrenador_id):
         """Create a new team for a trainer"""
@@ -53,34 +67,91 @@ class DatabaseQueries:
             entrenador_id=entrenador_id,
             lista_pokemon=[]
         )
-        self.session.add(team)
-        self.session.commit()
+        with session_scope(self.engine) as session:
+            session.add(team)
+            session.flush()
+            session.refresh(team)  # Load num_pokemon so it can be read after the session closes
         return team
     
     def add_pokemon_to_team(self, team_id, pokemon_especie_nombre):
-        """Add a Pokemon to a team"""
-        team = self.session.query(Equipo).filter_by(id=team_id).first()
-        if team:
-            if len(team.lista_pokemon) < 6:
-                team.lista_pokemon.append(pokemon_especie_nombre)
-                self.session.commit()
-                return True
-        return False
+        """Add a Pokemon to the next free slot of a team (6 slots at most)"""
+        with session_scope(self.engine) as session:
+            if session.get(Equipo, team_id) is None:
+                return False
+            slot = session.execute(
+                select(func.count()).where(equipo_pokemon.c.equipo_id == team_id)
+            ).scalar() + 1
+            if slot > 6:
+                return False
+            session.execute(equipo_pokemon.insert().values(
+                equipo_id=team_id, slot=slot, pokemon=pokemon_especie_nombre.strip().lower()
+            ))
+        return True
+    
+    def get_team_pokemon(self, team_id):
+        """Names of a team's Pokemon in slot order"""
+        with session_scope(self.engine) as session:
+            return session.execute(
+                select(equipo_pokemon.c.pokemon)
+                .where(equipo_pokemon.c.equipo_id == team_id)
+                .order_by(equipo_pokemon.c.slot)
+            ).scalars().all()
+    
+    def get_teams_with_pokemon(self, pokemon_especie_nombre):
+        """Teams that include a Pokemon"""
+        equipos = select(equipo_pokemon.c.equipo_id).where(
+            equipo_pokemon.c.pokemon == pokemon_especie_nombre.strip().lower()
+        )
+        with session_scope(self.engine) as session:
+            return session.query(Equipo).filter(Equipo.id.in_(equipos)).order_by(Equipo.id).all()
+    
+    def get_most_used_pokemon(self, limit=10):
+        """(pokemon, number of teams using it), most used first"""
+        equipos = func.count(equipo_pokemon.c.equipo_id.distinct())
+        with session_scope(self.engine) as session:
+            return session.execute(
+                select(equipo_pokemon.c.pokemon, equipos)
+                .group_by(equipo_pokemon.c.pokemon)
+                .order_by(equipos.desc(), equipo_pokemon.c.pokemon)
+                .limit(limit)
+            ).all()
     
     def get_stats(self):
-        """Get database statistics"""
-        total_pokemon_species = self.session.query(PokemonEspecie).count()
-        total_pokemon = self.session.query(Pokemon).count()
-        total_trainers = self.session.query(Entrenador).count()
-        total_teams = self.session.query(Equipo).count()
+        """Get database statistics from the trigger-maintained estadistica table (one small read).
+        
+        Besides the four totals: species per type (any slot) and per
+        generation, legendary/mythical/baby counts and a histogram of team
+        sizes (number of teams per member count).
+        """
+        with session_scope(self.engine) as session:
+            filas = session.execute(select(Estadistica.grupo, Estadistica.clave, Estadistica.valor)).all()
+        grupos = {}
+        for grupo, clave, valor in filas:
+            if valor:
+                grupos.setdefault(grupo, {})[clave] = valor
+        totales = grupos.get('total', {})
+        estados = grupos.get('estado', {})
         
         return {
-            'total_pokemon_species': total_pokemon_species,
-            'total_pokemon': total_pokemon,
-            'total_trainers': total_trainers,
-            'total_teams': total_teams
+            'total_pokemon_species': totales.get('total_pokemon_species', 0),
+            'total_pokemon': totales.get('total_pokemon', 0),
+            'total_trainers': totales.get('total_trainers', 0),
+            'total_teams': totales.get('total_teams', 0),
+            'legendary': estados.get('es_legendario', 0),
+            'mythical': estados.get('es_mitico', 0),
+            'baby': estados.get('es_bebe', 0),
+            'by_type': dict(sorted(grupos.get('tipo', {}).items())),
+            'by_generation': dict(sorted(grupos.get('generacion', {}).items())),
+            'team_sizes': {int(tamano): equipos for tamano, equipos in sorted(
+                grupos.get('tamano_equipo', {}).items(), key=lambda item: int(item[0])
+            )}
         }
     
+    def rebuild_stats(self):
+        """Recompute the statistics from the data, e.g. after editing the database by hand"""
+        from migrations import rebuild_statistics
+        with self.engine.begin() as conn:
+            rebuild_statistics(conn)
+    
     def close(self):
-        """Close database session"""
-        self.session.close()
+        """Nothing to release: every query closes its own session and the engine is shared"""
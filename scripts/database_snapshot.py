@@ -0,0 +1,114 @@
+"""
+In-memory read-only snapshot of pokemon.db
+Copies the database file into a shared-cache in-memory SQLite database with
+the backup API so browsing queries never touch the disk; reload() publishes
+new data written by the loader
+"""
+
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+_generations = itertools.count(1)
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+class DatabaseSnapshot:
+    """In-memory copy of a database file behind a read-only SQLAlchemy engine.
+
+    Every pooled connection opens the current copy (shared cache, so the
+    data exists once however many readers there are). reload() loads a new
+    copy and points new connections at it; queries already running finish on
+    the previous copy, which SQLite frees when its last connection closes.
+    """
+
+    def __init__(self, db_path='pokemon.db', pool_size=8):
+        self.db_path = db_path
+        self.reloads = 0
+        self.load_time = 0.0
+        self.loaded_at = None
+        self._uri = None
+        self._anchor = None  # Keeps the current copy alive between queries
+        self._lock = threading.Lock()
+        self.engine = create_engine('sqlite://', creator=self._connect, poolclass=QueuePool,
+                                    pool_size=pool_size, max_overflow=pool_size)
+
+        @event.listens_for(self.engine, 'connect')
+        def read_only(dbapi_connection, connection_record):
+            dbapi_connection.execute('PRAGMA query_only = ON')
+
+        self.reload()
+
+    def _connect(self):
+        with self._lock:
+            uri = self._uri
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    def reload(self):
+        """Copy the database file into a fresh in-memory database and serve reads from it"""
+        started = time.perf_counter()
+        if not os.path.exists(self.db_path):
+            raise FileNotFoundError(f"No database to snapshot at {self.db_path}")
+        uri = f"file:pokedex-snapshot-{next(_generations)}?mode=memory&cache=shared"
+        anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        source = sqlite3.connect(self.db_path)
+        try:
+            source.backup(anchor)
+        except Exception:
+            anchor.close()
+            raise
+        finally:
+            source.close()
+
+        with self._lock:
+            previous = self._anchor
+            self._anchor, self._uri = anchor, uri
+            self.reloads += 1
+            self.load_time = time.perf_counter() - started
+            self.loaded_at = time.time()
+        self.engine.dispose()  # Idle pooled connections still point at the previous copy
+        if previous is not None:
+            previous.close()
+        return self.load_time
+
+    def stats(self):
+        with self._lock:
+            return {'reloads': self.reloads, 'load_time': self.load_time, 'loaded_at': self.loaded_at}
+
+    def close(self):
+        """Drop the pooled connections and the in-memory copy"""
+        self.engine.dispose()
+        with self._lock:
+            anchor, self._anchor = self._anchor, None
+        if anchor is not None:
+            anchor.close()
+
+def get_snapshot(db_path='pokemon.db'):
+    """Process-wide snapshot of a database file, loaded on first use"""
+    key = os.path.abspath(db_path)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None:
+            snapshot = _snapshots[key] = DatabaseSnapshot(db_path)
+        return snapshot
+
+def reload_snapshot(db_path='pokemon.db'):
+    """Reload the snapshot of `db_path` if one is being served. Returns whether it was reloaded."""
+    with _snapshots_lock:
+        snapshot = _snapshots.get(os.path.abspath(db_path))
+    if snapshot is None:
+        return False
+    snapshot.reload()
+    return True
+
+def close_snapshots():
+    """Free every in-memory snapshot (e.g. on exit)"""
+    with _snapshots_lock:
+        snapshots = list(_snapshots.values())
+        _snapshots.clear()
+    for snapshot in snapshots:
+        snapshot.close()
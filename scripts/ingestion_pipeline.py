@@ -0,0 +1,176 @@
+"""
+Staged streaming pipeline used for ingestion
+Stages run on their own thread pools and are connected by bounded queues, so
+a slow stage applies backpressure instead of letting work pile up in memory
+"""
+
+import queue
+import threading
+import time
+
+_DONE = object()
+
+class Stage:
+    """One pipeline step: `func` applied to every item by `workers` threads"""
+
+    def __init__(self, name, func, workers=1):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.queue_depth_max = 0
+        self._queue_depth_total = 0
+        self._lock = threading.Lock()
+
+    def _record(self, elapsed, ok, queue_depth):
+        with self._lock:
+            self.busy_time += elapsed
+            if ok:
+                self.processed += 1
+            else:
+                self.errors += 1
+            self.queue_depth_max = max(self.queue_depth_max, queue_depth)
+            self._queue_depth_total += queue_depth
+
+    def metrics(self, wall_time=None):
+        """Timing and input-queue depth statistics for this stage"""
+        items = self.processed + self.errors
+        metrics = {
+            'stage': self.name,
+            'workers': self.workers,
+            'processed': self.processed,
+            'errors': self.errors,
+            'busy_time': self.busy_time,
+            'avg_ms': self.busy_time / items * 1000 if items else 0.0,
+            'queue_depth_max': self.queue_depth_max,
+            'queue_depth_avg': self._queue_depth_total / items if items else 0.0
+        }
+        if wall_time:
+            # Share of the available worker time spent busy; ~1.0 marks the bottleneck
+            metrics['utilization'] = self.busy_time / (wall_time * self.workers)
+        return metrics
+
+class Pipeline:
+    """Chain of Stages ending in a sink that runs in the calling thread.
+
+    Every stage reads from a bounded input queue. The sink (e.g. the single
+    database writer) runs in the caller's thread so it can own resources
+    that are not thread-safe. `on_error(stage, item, exc)` is called for
+    items whose stage function raised; those items are dropped.
+    """
+
+    def __init__(self, stages, sink, queue_size=32, on_error=None):
+        self.stages = stages
+        self.sink = sink
+        self.queue_size = queue_size
+        self.on_error = on_error
+        self.wall_time = 0.0
+        self.latencies = []
+        self._stop = threading.Event()
+
+    def run(self, items):
+        """Push `items` through every stage; returns when the sink has consumed everything"""
+        self._stop.clear()
+        self.latencies = []
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        started = time.perf_counter()
+
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]), daemon=True)]
+        for idx, stage in enumerate(self.stages):
+            next_workers = self.stages[idx + 1].workers if idx + 1 < len(self.stages) else 1
+            remaining = [stage.workers]
+            for _ in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[idx], queues[idx + 1], remaining, next_workers),
+                    daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._drain(queues[-1])
+        finally:
+            self.wall_time = time.perf_counter() - started
+        return self.metrics()
+
+    def stop(self):
+        """Ask every stage to stop taking new items (e.g. after Ctrl-C)"""
+        self._stop.set()
+
+    def metrics(self):
+        """Per-stage metrics of the last run, sink last"""
+        return [stage.metrics(self.wall_time) for stage in (*self.stages, self.sink)]
+
+    def latency_percentile(self, percentile):
+        """End-to-end latency (seconds) of items that reached the sink, e.g. percentile=99"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+    def _put(self, q, item):
+        """Blocking put that gives up once the pipeline is stopped"""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed(self, items, out_q):
+        # Items travel as (enqueue time, item) so end-to-end latency can be measured
+        for item in items:
+            if not self._put(out_q, (time.perf_counter(), item)):
+                return
+        for _ in range(self.stages[0].workers if self.stages else 1):
+            self._put(out_q, _DONE)
+
+    def _work(self, stage, in_q, out_q, remaining, next_workers):
+        while not self._stop.is_set():
+            depth = in_q.qsize()
+            envelope = in_q.get()
+            if envelope is _DONE:
+                break
+            enqueued, item = envelope
+            started = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                stage._record(time.perf_counter() - started, False, depth)
+                if self.on_error:
+                    self.on_error(stage.name, item, e)
+                continue
+            stage._record(time.perf_counter() - started, True, depth)
+            if result is not None and not self._put(out_q, (enqueued, result)):
+                return
+
+        # The last worker of a stage to finish tells the next stage to finish
+        with stage._lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(next_workers):
+                self._put(out_q, _DONE)
+
+    def _drain(self, in_q):
+        while True:
+            depth = in_q.qsize()
+            envelope = in_q.get()
+            if envelope is _DONE:
+                return
+            enqueued, item = envelope
+            started = time.perf_counter()
+            try:
+                self.sink.func(item)
+            except Exception as e:
+                self.sink._record(time.perf_counter() - started, False, depth)
+                if self.on_error:
+                    self.on_error(self.sink.name, item, e)
+                continue
+            finished = time.perf_counter()
+            self.sink._record(finished - started, True, depth)
+            self.latencies.append(finished - enqueued)
@@ -1,15 +1,19 @@
 from pokedex_manager import PokedexManager
 from database_queries import DatabaseQueries
 from pokeapi_loader import PokeAPILoader
+from pokeapi_dump import LocalDumpSource
+from database import dispose_engines
 import os
+import sys
 
 class PokemonCLI:
     """Interactive CLI for Pokemon Management System"""
     
-    def __init__(self):
-        self.pokedex = PokedexManager()
-        self.db = DatabaseQueries()
-        self.loader = PokeAPILoader()
+    def __init__(self, snapshot=False):
+        self.loader = PokeAPILoader()  # Creates pokemon.db, so it goes before any snapshot
+        # --snapshot serves Pokedex reads from an in-memory copy reloaded after every load
+        self.pokedex = PokedexManager(profile='snapshot' if snapshot else 'serving')
+        self.db = DatabaseQueries(snapshot=snapshot)
         self.current_trainer = None
     
     def clear_screen(self):
@@ -56,16 +60,25 @@ class PokemonCLI:
             print("="*60)
             print("\n1. Load Pokemon Range")
             print("2. Load Single Pokemon")
-            print("3. Back to Main Menu")
+            print(f"3. Retry Failed Pokemon ({len(self.loader.get_failed_ids())} pending)")
+            print("4. Import from Local PokeAPI Dump")
+            print("5. Update Type Matchups")
+            print("6. Back to Main Menu")
             print("\n" + "="*60)
             
-            choice = input("\nSelect option (1-3): ").strip()
+            choice = input("\nSelect option (1-6): ").strip()
             
             if choice == "1":
                 self.load_pokemon_range()
             elif choice == "2":
                 self.load_single_pokemon()
             elif choice == "3":
+                self.retry_failed_pokemon()
+            elif choice == "4":
+                self.import_from_dump()
+            elif choice == "5":
+                self.update_type_matchups()
+            elif choice == "6":
                 break
             else:
                 input("Invalid choice! Press Enter to continue...")
@@ -87,15 +100,48 @@ class PokemonCLI:
                 input("Press Enter to continue...")
                 return
             
+            workers = input(f"Concurrent downloads [{self.loader.max_workers}]: ").strip()
+            workers = int(workers) if workers else self.loader.max_workers
+            
             print(f"\nLoading Pokemon {start} to {end}...")
-            self.loader.load_pokemon_range(start, end)
-            print(f"\nSuccessfully loaded {end - start + 1} Pokemon!")
+            result = self.loader.load_pokemon_range(start, end, max_workers=workers)
+            print(f"\nSuccessfully loaded {result['loaded']} Pokemon "
+                  f"({result['pokemon_per_second']:.2f} Pokemon/s)!")
             input("Press Enter to continue...")
             
         except ValueError:
             print("Please enter valid numbers!")
             input("Press Enter to continue...")
     
+    def retry_failed_pokemon(self):
+        """Reload only the Pokemon whose last load failed"""
+        self.clear_screen()
+        result = self.loader.retry_failed()
+        print(f"\nRecovered {result['loaded']} Pokemon, {result['failed']} still failing.")
+        input("Press Enter to continue...")
+    
+    def import_from_dump(self):
+        """Import every Pokemon from a local PokeAPI api-data dump (no network)"""
+        self.clear_screen()
+        path = input("Path to the api-data dump: ").strip()
+        try:
+            dump_loader = PokeAPILoader(client=LocalDumpSource(path))
+        except FileNotFoundError as e:
+            print(e)
+            input("Press Enter to continue...")
+            return
+        result = dump_loader.load_all_pokemon()
+        self.loader.loaded_pokemon.update(dump_loader.loaded_pokemon)
+        print(f"\nImported {result['loaded']} Pokemon ({result['pokemon_per_second']:.2f} Pokemon/s)!")
+        input("Press Enter to continue...")
+    
+    def update_type_matchups(self):
+        """Fill the weaknesses and resistances of every stored species"""
+        self.clear_screen()
+        updated = self.loader.update_type_matchups()
+        print(f"\nUpdated weaknesses and resistances of {updated} species.")
+        input("Press Enter to continue...")
+    
     def load_single_pokemon(self):
         """Load a single Pokemon by ID"""
         self.clear_screen()
@@ -103,6 +149,7 @@ class PokemonCLI:
             pokemon_id = int(input("Enter Pokemon ID: "))
             print(f"\nLoading Pokemon {pokemon_id}...")
             self.loader.load_pokemon_species(pokemon_id)
+            self.loader.publish()
             print("Pokemon loaded successfully!")
             input("Press Enter to continue...")
         except ValueError:
@@ -124,10 +171,12 @@ class PokemonCLI:
             print("5. View Mythical Pokemon")
             print("6. View Baby Pokemon")
             print("7. View All Types")
-            print("8. Back to Main Menu")
+            print("8. Search by Stat")
+            print("9. Full-Text Search (species, moves, abilities)")
+            print("10. Back to Main Menu")
             print("\n" + "="*60)
             
-            choice = input("\nSelect option (1-8): ").strip()
+            choice = input("\nSelect option (1-10): ").strip()
             
             if choice == "1":
                 self.search_by_name()
@@ -144,6 +193,10 @@ class PokemonCLI:
             elif choice == "7":
                 self.view_all_types()
             elif choice == "8":
+                self.search_by_stat()
+            elif choice == "9":
+                self.search_text()
+            elif choice == "10":
                 break
             else:
                 input("Invalid choice! Press Enter to continue...")
@@ -159,6 +212,9 @@ class PokemonCLI:
             self.display_pokemon_list(results)
         else:
             print("No Pokemon found!")
+            sugerencias = self.pokedex.suggest_names(nombre)
+            if sugerencias:
+                print(f"Did you mean: {', '.join(sugerencias)}?")
         
         input("Press Enter to continue...")
     
@@ -170,12 +226,20 @@ class PokemonCLI:
         for idx, type_tuple in enumerate(types, 1):
             print(f"{idx}. {type_tuple[0]}")
         
+        print("\nCombine numbers with '+' for all of them (e.g. 3+7) or ',' for any of them (e.g. 3,7)")
+        
         try:
-            choice = int(input("\nSelect type number: "))
-            if 1 <= choice <= len(types):
-                tipo = types[choice - 1][0]
-                results = self.pokedex.search_by_type(tipo)
-                self.display_pokemon_list(results, f"Pokemon of type: {tipo}")
+            entrada = input("Select type number(s): ").strip()
+            match_all = ',' not in entrada
+            choices = [int(part) for part in entrada.replace('+', ',').split(',')]
+            if all(1 <= choice <= len(types) for choice in choices):
+                tipos = [types[choice - 1][0] for choice in choices]
+                if len(tipos) == 1:
+                    results = self.pokedex.search_by_type(tipos[0])
+                else:
+                    results = self.pokedex.search_by_types(tipos, match_all=match_all)
+                separador = '/' if match_all else ' or '
+                self.display_pokemon_list(results, f"Pokemon of type: {separador.join(tipos)}")
             else:
                 print("Invalid choice!")
         except ValueError:
@@ -226,6 +290,47 @@ class PokemonCLI:
         self.display_pokemon_list(results, "Baby Pokemon")
         input("Press Enter to continue...")
     
+    def search_by_stat(self):
+        """List Pokemon within a stat range, highest first"""
+        self.clear_screen()
+        print("Stats: hp, attack, defense, special-attack, special-defense, speed, total")
+        stat = input("Stat: ").strip().lower()
+        try:
+            min_value = int(input("Minimum value: ") or 0)
+            max_value = int(input("Maximum value: ") or 1000)
+        except ValueError:
+            print("Please enter valid numbers!")
+            input("Press Enter to continue...")
+            return
+        
+        results = self.pokedex.get_pokemon_by_stats({stat: (min_value, max_value)}, order_by=stat, limit=20)
+        if results:
+            print(f"\nTop Pokemon with {stat} between {min_value} and {max_value}:")
+            for idx, poke in enumerate(results, 1):
+                value = getattr(poke, self.pokedex.stat_column_name(stat))
+                print(f"{idx:2}. {poke.especie:20} | {stat}: {value}")
+        else:
+            print("No Pokemon found!")
+        input("Press Enter to continue...")
+    
+    def search_text(self):
+        """Ranked search over species names, move and ability names and descriptions"""
+        self.clear_screen()
+        print('Words match by prefix ("fla" finds flamethrower); wrap text in quotes for an exact phrase.')
+        texto = input("Search: ").strip()
+        if len(texto) > 1 and texto[0] == texto[-1] == '"':
+            results = self.pokedex.search(texto[1:-1], mode='phrase')
+        else:
+            results = self.pokedex.search(texto)
+        if results:
+            print(f"\nBest matches for '{texto}':")
+            for idx, result in enumerate(results, 1):
+                descripcion = (result['descripcion'] or '')[:40]
+                print(f"{idx:2}. [{result['kind']:9}] {result['nombre']:20} {descripcion}")
+        else:
+            print("No matches found!")
+        input("Press Enter to continue...")
+    
     def view_all_types(self):
         """View all available types"""
         self.clear_screen()
@@ -324,7 +429,7 @@ class PokemonCLI:
             teams = self.db.get_trainer_teams(trainer.id)
             print(f"\nTeams ({len(teams)}):")
             for team in teams:
-                print(f"  - {team.nombre}: {len(team.lista_pokemon)}/6 Pokemon")
+                print(f"  - {team.nombre}: {team.num_pokemon}/6 Pokemon")
         else:
             print("Trainer not found!")
         
@@ -342,7 +447,7 @@ class PokemonCLI:
             
             print(f"\nTeams for {self.current_trainer.nombre}:")
             for idx, team in enumerate(teams, 1):
-                print(f"{idx}. {team.nombre}")
+                print(f"{idx}. {team.nombre} ({team.num_pokemon}/6 Pokemon)")
             
             choice = input("\nEnter team number to manage (0 to create new): ")
             
@@ -350,9 +455,27 @@ class PokemonCLI:
                 team_name = input("Enter new team name: ")
                 team = self.db.create_team(team_name, self.current_trainer.id)
                 print(f"Team '{team_name}' created!")
+            elif choice.isdigit() and 1 <= int(choice) <= len(teams):
+                self.edit_team(teams[int(choice) - 1])
         
         input("Press Enter to continue...")
     
+    def edit_team(self, team):
+        """Show a team's Pokemon and add one to its next free slot"""
+        members = self.db.get_team_pokemon(team.id)
+        print(f"\n{team.nombre}:")
+        for slot, nombre in enumerate(members, 1):
+            print(f"  {slot}. {nombre}")
+        if len(members) >= 6:
+            print("This team is full (6/6).")
+            return
+        nombre = input("Pokemon to add (Enter to skip): ").strip()
+        if nombre:
+            if self.db.add_pokemon_to_team(team.id, nombre):
+                print(f"{nombre} added to {team.nombre}!")
+            else:
+                print("Could not add the Pokemon!")
+    
     def show_statistics(self):
         """Show database statistics"""
         self.clear_screen()
@@ -366,6 +489,26 @@ class PokemonCLI:
         print(f"Total Pokemon Instances:          {stats['total_pokemon']}")
         print(f"Total Trainers:                   {stats['total_trainers']}")
         print(f"Total Teams:                      {stats['total_teams']}")
+        print(f"Legendary / Mythical / Baby:      {stats['legendary']} / {stats['mythical']} / {stats['baby']}")
+        
+        if stats['by_type']:
+            print("\nSpecies per type:")
+            for tipo, count in stats['by_type'].items():
+                print(f"  {tipo:12} {count}")
+        if stats['by_generation']:
+            print("\nSpecies per generation:")
+            for generacion, count in stats['by_generation'].items():
+                print(f"  {generacion:16} {count}")
+        if stats['team_sizes']:
+            print("\nTeams by size:")
+            for size, count in stats['team_sizes'].items():
+                print(f"  {size}/6: {count}")
+        
+        most_used = self.db.get_most_used_pokemon(5)
+        if most_used:
+            print("\nMost used in teams:")
+            for nombre, teams in most_used:
+                print(f"  {nombre:20} {teams} teams")
         
         print("\n" + "="*60)
         input("Press Enter to continue...")
@@ -374,10 +517,11 @@ class PokemonCLI:
         """Clean up resources"""
         self.pokedex.close()
         self.db.close()
+        dispose_engines()
 
 def main():
     """Launch the Pokemon Management System"""
-    cli = PokemonCLI()
+    cli = PokemonCLI(snapshot="--snapshot" in sys.argv)
     cli.main_menu()
 
 if __name__ == "__main__":
@@ -8,14 +8,19 @@ from models import (
     GestorEntrenadores, GestorPokedex, SistemaPokemon
 )
 from pokeapi_integration import PokeAPIIntegration
+from pokeapi_client import create_default_client
+from pokeapi_dump import LocalDumpSource
 from typing import Optional
+import sys
 
 class PokemonCLI:
     """CLI for Pokemon Management System"""
     
-    def __init__(self):
+    def __init__(self, offline: bool = False, dump_path: Optional[str] = None, db_path: str = 'pokemon.db'):
         self.sistema = SistemaPokemon()
-        self.api = PokeAPIIntegration()
+        client = LocalDumpSource(dump_path) if dump_path else create_default_client(offline=offline)
+        # Lookups check memory, then pokemon.db, then PokeAPI
+        self.api = PokeAPIIntegration(client, db_path=db_path)
         self.entrenador_actual: Optional[Entrenador] = None
         self.ejecutar = True
     
@@ -33,7 +38,8 @@ class PokemonCLI:
             print("1. Create Trainer")
             print("2. Login Trainer")
             print("3. Browse Pokedex")
-            print("4. Exit")
+            print("4. Cache Statistics")
+            print("5. Exit")
             
             opcion = input("\nSelect option: ").strip()
             
@@ -44,6 +50,8 @@ class PokemonCLI:
             elif opcion == "3":
                 self.explorar_pokedex()
             elif opcion == "4":
+                self.ver_estadisticas_cache()
+            elif opcion == "5":
                 self.ejecutar = False
                 print("Goodbye!")
             else:
@@ -160,7 +168,7 @@ class PokemonCLI:
         especie = self.api.obtenerPokemonEspecie(nombre_pokemon)
         
         if not especie:
-            print("Pokemon not found!")
+            self.pokemon_no_encontrado(nombre_pokemon)
             return
         
         # Create Pokemon instance
@@ -202,30 +210,24 @@ class PokemonCLI:
             if especie:
                 self.mostrar_pokemon(especie)
             else:
-                print("Pokemon not found!")
+                self.pokemon_no_encontrado(nombre)
         
         elif opcion == "2":
             tipo = input("Type (e.g., fire, water, grass): ").strip()
             print(f"Fetching {tipo} type Pokemon...")
-            pokemon_list = self.api.obtenerPokemonPorTipo(tipo)
-            
-            if pokemon_list:
-                for pokemon in pokemon_list[:10]:
-                    print(f"  - {pokemon.nombre} (Types: {', '.join(pokemon.tipo)})")
-            else:
-                print("No Pokemon found!")
+            self.mostrar_paginas(
+                lambda offset: self.api.paginaPokemonPorTipo(tipo, offset=offset, limit=10),
+                lambda pokemon: f"  - {pokemon.nombre} (Types: {', '.join(pokemon.tipo)})"
+            )
         
         elif opcion == "3":
             try:
                 gen = int(input("Generation number (1-9): ").strip())
                 print(f"Fetching Generation {gen}...")
-                pokemon_list = self.api.obtenerGeneracion(gen)
-                
-                if pokemon_list:
-                    for pokemon in pokemon_list[:10]:
-                        print(f"  - {pokemon.nombre}")
-                else:
-                    print("No Pokemon found!")
+                self.mostrar_paginas(
+                    lambda offset: self.api.paginaGeneracion(gen, offset=offset, limit=10),
+                    lambda pokemon: f"  - {pokemon.nombre}"
+                )
             except ValueError:
                 print("Invalid generation number!")
     
@@ -243,17 +245,69 @@ class PokemonCLI:
             if especie:
                 self.mostrar_pokemon(especie)
             else:
-                print("Pokemon not found!")
+                self.pokemon_no_encontrado(nombre)
         
         elif opcion == "2":
             tipo = input("Type: ").strip()
-            pokemon_list = self.api.obtenerPokemonPorTipo(tipo)
-            
-            if pokemon_list:
-                for pokemon in pokemon_list[:10]:
-                    print(f"  - {pokemon.nombre}")
-            else:
+            self.mostrar_paginas(
+                lambda offset: self.api.paginaPokemonPorTipo(tipo, offset=offset, limit=10),
+                lambda pokemon: f"  - {pokemon.nombre}"
+            )
+    
+    def pokemon_no_encontrado(self, nombre: str):
+        """Report a failed lookup with spelling suggestions"""
+        print("Pokemon not found!")
+        sugerencias = self.api.sugerirNombres(nombre)
+        if sugerencias:
+            print(f"Did you mean: {', '.join(sugerencias)}?")
+    
+    def mostrar_paginas(self, obtener_pagina, formato):
+        """Print a paginated listing 10 at a time, fetching each page on demand"""
+        offset = 0
+        while offset is not None:
+            pagina = obtener_pagina(offset)
+            if not pagina['resultados'] and offset == 0:
                 print("No Pokemon found!")
+                return
+            for pokemon in pagina['resultados']:
+                print(formato(pokemon))
+            offset = pagina['siguiente']
+            if offset is not None:
+                print(f"Showing {offset} of {pagina['total']}")
+                if input("Show more? (y/n): ").strip().lower() != "y":
+                    return
+    
+    def ver_estadisticas_cache(self):
+        """Show in-memory and on-disk cache statistics"""
+        print("\n--- CACHE STATISTICS ---")
+        memoria = self.api.estadisticasMemoria()
+        print(f"Memory ({memoria['total_bytes']} bytes"
+              + (f" of {memoria['max_bytes']})" if memoria['max_bytes'] else ")"))
+        for tipo, stats in memoria.items():
+            if isinstance(stats, dict):
+                print(f"  {tipo}: {stats['entries']}/{stats['limit']} entries, "
+                      f"{stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+                      f"{stats['expired']} expired, {stats['evictions']} evicted")
+
+        base_datos = self.api.estadisticasBaseDatos()
+        if base_datos:
+            print(f"Database: {base_datos['hits']} hits, {base_datos['misses']} misses, "
+                  f"{base_datos['writes']} Pokemon written back")
+
+        rechazos = self.api.estadisticasNombresInexistentes()
+        print(f"Unknown names rejected locally: {rechazos['rechazados_indice']} by the name index "
+              f"({rechazos['nombres_indice']} names), {rechazos['rechazados_404']} by the 404 cache")
+
+        coalescencia = self.api.estadisticasCoalescencia()
+        if coalescencia:
+            print(f"Request coalescing: {coalescencia['executions']} fetches, "
+                  f"{coalescencia['coalesced']} duplicate requests served by an in-flight fetch")
+
+        respuestas = self.api.estadisticasCache()
+        if respuestas:
+            print("Response cache:")
+            for clave, valor in respuestas.items():
+                print(f"  {clave}: {valor}")
     
     def mostrar_pokemon(self, especie: PokemonEspecie):
         """Display Pokemon details"""
@@ -276,7 +330,10 @@ class PokemonCLI:
 
 def main():
     """Main entry point"""
-    cli = PokemonCLI()
+    # --offline replays previously cached PokeAPI responses without network access,
+    # --dump PATH reads a local PokeAPI api-data dump instead
+    dump_path = sys.argv[sys.argv.index("--dump") + 1] if "--dump" in sys.argv[:-1] else None
+    cli = PokemonCLI(offline="--offline" in sys.argv, dump_path=dump_path)
     cli.iniciar()
 
 if __name__ == "__main__":
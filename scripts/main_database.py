@@ -94,7 +94,7 @@ def trainer_menu(db):
             teams = db.get_trainer_teams(trainer.id)
             print(f"\nTeams for {trainer.nombre}:")
             for i, team in enumerate(teams, 1):
-                print(f"{i}. {team.nombre} ({len(team.lista_pokemon)}/6 Pokemon)")
+                print(f"{i}. {team.nombre} ({team.num_pokemon}/6 Pokemon)")
         else:
             print("Trainer not found!")
 
@@ -106,6 +106,11 @@ def show_statistics(db):
     print(f"Total Pokemon Instances: {stats['total_pokemon']}")
     print(f"Total Trainers: {stats['total_trainers']}")
     print(f"Total Teams: {stats['total_teams']}")
+    print(f"Legendary: {stats['legendary']}, Mythical: {stats['mythical']}, Baby: {stats['baby']}")
+    if stats['by_type']:
+        print("Species per type: " + ", ".join(f"{tipo} {count}" for tipo, count in stats['by_type'].items()))
+    if stats['team_sizes']:
+        print("Teams by size: " + ", ".join(f"{size}/6: {count}" for size, count in stats['team_sizes'].items()))
 
 def main():
     """Main application loop"""
@@ -0,0 +1,100 @@
+"""
+In-process memoization for converted domain objects
+Keeps PokemonEspecie, Ataque and Habilidad instances so repeated lookups
+skip both the network and the JSON conversion
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_LIMITS = {'especie': 256, 'ataque': 2048, 'habilidad': 1024}
+DEFAULT_TTL = 60 * 60  # 1 hour
+
+class MemoryCache:
+    """LRU cache with one entry limit per kind of object, TTL expiry and an optional byte budget.
+
+    `limits` maps a kind ('especie', 'ataque', 'habilidad', ...) to its
+    maximum number of entries. With `max_bytes` set, the pickled size of
+    every entry is tracked and the least recently used entries of the
+    largest kind are evicted once the total goes over budget.
+    """
+
+    def __init__(self, limits=None, ttl=DEFAULT_TTL, max_bytes=None):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = {kind: OrderedDict() for kind in self.limits}
+        self._counters = {kind: {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0} for kind in self.limits}
+        self._lock = threading.Lock()
+
+    def get(self, kind, key):
+        """Return the cached object or None; refreshes its LRU position"""
+        key = str(key).strip().lower()
+        with self._lock:
+            entries = self._entries[kind]
+            entry = entries.get(key)
+            if entry is None:
+                self._counters[kind]['misses'] += 1
+                return None
+            value, expires_at, size = entry
+            if expires_at < time.time():
+                self._remove(kind, key)
+                self._counters[kind]['expired'] += 1
+                self._counters[kind]['misses'] += 1
+                return None
+            entries.move_to_end(key)
+            self._counters[kind]['hits'] += 1
+            return value
+
+    def put(self, kind, key, value, aliases=()):
+        """Store `value` under `key` and every non-empty alias (e.g. id and name)"""
+        size = len(pickle.dumps(value)) if self.max_bytes else 0
+        expires_at = time.time() + self.ttl
+        keys = {str(k).strip().lower() for k in (key, *aliases) if k is not None and k != ''}
+        with self._lock:
+            entries = self._entries[kind]
+            for k in keys:
+                if k in entries:
+                    self._remove(kind, k)
+                entries[k] = (value, expires_at, size)
+                self.total_bytes += size
+            while len(entries) > self.limits[kind]:
+                self._evict(kind)
+            if self.max_bytes:
+                while self.total_bytes > self.max_bytes and any(self._entries.values()):
+                    self._evict(max(self._entries, key=lambda k: len(self._entries[k])))
+
+    def stats(self):
+        """Entry counts and hit/miss/expiry/eviction counters per kind"""
+        with self._lock:
+            stats = {}
+            for kind, entries in self._entries.items():
+                counters = dict(self._counters[kind])
+                lookups = counters['hits'] + counters['misses']
+                counters['entries'] = len(entries)
+                counters['limit'] = self.limits[kind]
+                counters['hit_rate'] = counters['hits'] / lookups if lookups else 0.0
+                stats[kind] = counters
+            stats['total_bytes'] = self.total_bytes
+            stats['max_bytes'] = self.max_bytes
+            return stats
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            for kind in self._entries:
+                self._entries[kind].clear()
+                self._counters[kind] = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+            self.total_bytes = 0
+
+    def _remove(self, kind, key):
+        _, _, size = self._entries[kind].pop(key)
+        self.total_bytes -= size
+
+    def _evict(self, kind):
+        key = next(iter(self._entries[kind]))
+        self._remove(kind, key)
+        self._counters[kind]['evictions'] += 1
@@ -0,0 +1,342 @@
+"""
+Schema migrations for pokemon.db
+create_all() only creates missing tables; the numbered migrations below
+bring databases created by older versions up to the current schema and
+record what was applied in the schema_version table.
+
+Usage:
+    python migrations.py [db_path]            Apply pending migrations
+    python migrations.py [db_path] --explain  Also report EXPLAIN QUERY PLAN per query helper
+"""
+
+import sys
+from datetime import datetime
+from sqlalchemy import event, inspect, select, text
+from database import Base, SchemaVersion, STAT_COLUMNS, get_engine
+from text_search import SEARCH_SOURCES
+
+def _add_column(conn, table, column, column_type):
+    """ALTER TABLE ADD COLUMN unless the column already exists"""
+    existing = {c['name'] for c in inspect(conn).get_columns(table)}
+    if column not in existing:
+        conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}'))
+
+def _create_indexes(conn, names):
+    """Create the named indexes declared on the models (IF NOT EXISTS)"""
+    indexes = {index.name: index for table in Base.metadata.sorted_tables for index in table.indexes}
+    for name in names:
+        indexes[name].create(conn, checkfirst=True)
+
+def _pokemon_tipos(conn):
+    # Every type of a Pokemon, not just the first (stored by the loader since pokemon.tipos exists)
+    _add_column(conn, 'pokemon', 'tipos', 'JSON')
+
+def _secondary_indexes(conn):
+    _create_indexes(conn, [
+        'ix_pokemon_especie_tipo_generacion',
+        'ix_pokemon_especie_generacion',
+        'ix_pokemon_especie_es_legendario',
+        'ix_pokemon_especie_es_mitico',
+        'ix_pokemon_especie_es_bebe',
+        'ix_pokemon_especie',
+        'ix_equipo_entrenador_id',
+        'ix_pokemon_attacks_pokemon_attack',
+        'ix_pokemon_attacks_attack',
+        'ix_pokemon_abilities_pokemon_habilidad',
+        'ix_pokemon_abilities_habilidad',
+        'ix_pokemon_species_rel_pokemon',
+        'ix_pokemon_species_rel_especie',
+        'ix_ingestion_checkpoint_estado',
+    ])
+    conn.execute(text('ANALYZE'))  # Give the planner row counts for the new indexes
+
+def _especie_tipo_relation(conn):
+    # The table itself comes from create_all(); fill it from the stored Pokemon types
+    _create_indexes(conn, ['ix_pokemon_especie_tipo_tipo'])
+    conn.execute(text("""
+        INSERT OR IGNORE INTO pokemon_especie_tipo (especie_id, slot, tipo)
+        SELECT e.id, t.key + 1, t.value
+        FROM pokemon p
+        JOIN pokemon_especie e ON e.nombre = p.especie
+        JOIN json_each(p.tipos) t
+        WHERE p.tipos IS NOT NULL
+    """))
+    # Species loaded before pokemon.tipos existed only know their primary type
+    conn.execute(text("""
+        INSERT OR IGNORE INTO pokemon_especie_tipo (especie_id, slot, tipo)
+        SELECT e.id, 1, e.tipo
+        FROM pokemon_especie e
+        WHERE e.tipo IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM pokemon_especie_tipo r WHERE r.especie_id = e.id)
+    """))
+    conn.execute(text('ANALYZE'))
+
+def _stat_columns(conn):
+    for column in STAT_COLUMNS.values():
+        _add_column(conn, 'pokemon', column, 'INTEGER')
+    assignments = ', '.join(
+        f"{column} = json_extract(atributos, '$.\"{stat}\"')"
+        for stat, column in STAT_COLUMNS.items() if stat != 'total'
+    )
+    conn.execute(text(f"UPDATE pokemon SET {assignments} WHERE atributos IS NOT NULL"))
+    conn.execute(text("""
+        UPDATE pokemon SET stat_total = coalesce(stat_hp, 0) + coalesce(stat_attack, 0)
+            + coalesce(stat_defense, 0) + coalesce(stat_special_attack, 0)
+            + coalesce(stat_special_defense, 0) + coalesce(stat_speed, 0)
+        WHERE atributos IS NOT NULL
+    """))
+    _create_indexes(conn, [f'ix_pokemon_{column}' for column in STAT_COLUMNS.values()])
+    conn.execute(text('ANALYZE'))
+
+def _pokemon_nombre(conn):
+    _add_column(conn, 'pokemon', 'nombre', 'VARCHAR(100)')
+    # Default forms (ids below 10000) share their species' name; other forms stay
+    # NULL and are found by id only
+    conn.execute(text("UPDATE pokemon SET nombre = especie WHERE nombre IS NULL AND id_pokemon < 10000"))
+    _create_indexes(conn, ['ix_pokemon_nombre'])
+
+def _search_index(conn):
+    # Word/prefix index and substring (trigram) index over species, moves and abilities
+    conn.execute(text("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            kind UNINDEXED, nombre, descripcion,
+            tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+        )
+    """))
+    conn.execute(text("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index_trigram USING fts5(
+            kind UNINDEXED, nombre, descripcion, tokenize = 'trigram'
+        )
+    """))
+    for kind, (source, nombre, descripcion, offset) in SEARCH_SOURCES.items():
+        def insert(row):
+            return ''.join(
+                f"INSERT INTO {index} (rowid, kind, nombre, descripcion) "
+                f"VALUES ({row}.id * 4 + {offset}, '{kind}', {row}.{nombre}, {row}.{descripcion}); "
+                for index in ('search_index', 'search_index_trigram')
+            )
+        delete = ''.join(
+            f"DELETE FROM {index} WHERE rowid = old.id * 4 + {offset}; "
+            for index in ('search_index', 'search_index_trigram')
+        )
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {source}_search_ai AFTER INSERT ON {source} "
+                          f"BEGIN {insert('new')}END"))
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {source}_search_ad AFTER DELETE ON {source} "
+                          f"BEGIN {delete}END"))
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {source}_search_au AFTER UPDATE OF {nombre}, {descripcion} "
+                          f"ON {source} BEGIN {delete}{insert('new')}END"))
+        for index in ('search_index', 'search_index_trigram'):
+            conn.execute(text(f"""
+                INSERT INTO {index} (rowid, kind, nombre, descripcion)
+                SELECT id * 4 + {offset}, '{kind}', {nombre}, {descripcion} FROM {source}
+            """))
+
+def _equipo_pokemon(conn):
+    # The table comes from create_all(); copy the first six members of every JSON team list
+    _create_indexes(conn, ['ix_equipo_pokemon_pokemon'])
+    conn.execute(text("""
+        INSERT OR IGNORE INTO equipo_pokemon (equipo_id, slot, pokemon)
+        SELECT e.id, m.key + 1, m.value
+        FROM equipo e
+        JOIN json_each(e.lista_pokemon) m
+        WHERE e.lista_pokemon IS NOT NULL AND m.key < 6
+    """))
+    conn.execute(text('ANALYZE'))
+
+def _bump(grupo, clave, delta):
+    """Trigger statement adding `delta` to an estadistica counter"""
+    return (f"INSERT INTO estadistica (grupo, clave, valor) VALUES ('{grupo}', {clave}, {delta}) "
+            f"ON CONFLICT (grupo, clave) DO UPDATE SET valor = valor + excluded.valor; ")
+
+def _species_counters(row, sign):
+    """Counters one pokemon_especie row contributes to"""
+    return (_bump('total', "'total_pokemon_species'", sign)
+            + _bump('generacion', f"coalesce(CAST({row}.generacion AS TEXT), 'unknown')", sign)
+            + ''.join(_bump('estado', f"'{flag}'", f"{sign} * coalesce({row}.{flag}, 0)")
+                      for flag in ('es_legendario', 'es_mitico', 'es_bebe')))
+
+def _team_size(equipo_id):
+    return f"(SELECT count(*) FROM equipo_pokemon WHERE equipo_id = {equipo_id})"
+
+# (trigger name, table, event, WHEN condition or None, body)
+STATISTICS_TRIGGERS = [
+    ('pokemon_especie_stats_ai', 'pokemon_especie', 'AFTER INSERT', None, _species_counters('new', 1)),
+    ('pokemon_especie_stats_ad', 'pokemon_especie', 'AFTER DELETE', None, _species_counters('old', -1)),
+    ('pokemon_especie_stats_au', 'pokemon_especie', 'AFTER UPDATE OF generacion, es_legendario, es_mitico, es_bebe',
+     None, _species_counters('old', -1) + _species_counters('new', 1)),
+    ('pokemon_especie_tipo_stats_ai', 'pokemon_especie_tipo', 'AFTER INSERT', None, _bump('tipo', 'new.tipo', 1)),
+    ('pokemon_especie_tipo_stats_ad', 'pokemon_especie_tipo', 'AFTER DELETE', None, _bump('tipo', 'old.tipo', -1)),
+    ('pokemon_especie_tipo_stats_au', 'pokemon_especie_tipo', 'AFTER UPDATE OF tipo', None,
+     _bump('tipo', 'old.tipo', -1) + _bump('tipo', 'new.tipo', 1)),
+    ('pokemon_stats_ai', 'pokemon', 'AFTER INSERT', None, _bump('total', "'total_pokemon'", 1)),
+    ('pokemon_stats_ad', 'pokemon', 'AFTER DELETE', None, _bump('total', "'total_pokemon'", -1)),
+    ('entrenador_stats_ai', 'entrenador', 'AFTER INSERT', None, _bump('total', "'total_trainers'", 1)),
+    ('entrenador_stats_ad', 'entrenador', 'AFTER DELETE', None, _bump('total', "'total_trainers'", -1)),
+    ('equipo_stats_ai', 'equipo', 'AFTER INSERT', None,
+     _bump('total', "'total_teams'", 1) + _bump('tamano_equipo', f"CAST({_team_size('new.id')} AS TEXT)", 1)),
+    ('equipo_stats_ad', 'equipo', 'AFTER DELETE', None,
+     _bump('total', "'total_teams'", -1) + _bump('tamano_equipo', f"CAST({_team_size('old.id')} AS TEXT)", -1)),
+    # A member moves its team from one size bucket to the next
+    ('equipo_pokemon_stats_ai', 'equipo_pokemon', 'AFTER INSERT',
+     'EXISTS (SELECT 1 FROM equipo WHERE id = new.equipo_id)',
+     _bump('tamano_equipo', f"CAST({_team_size('new.equipo_id')} - 1 AS TEXT)", -1)
+     + _bump('tamano_equipo', f"CAST({_team_size('new.equipo_id')} AS TEXT)", 1)),
+    ('equipo_pokemon_stats_ad', 'equipo_pokemon', 'AFTER DELETE',
+     'EXISTS (SELECT 1 FROM equipo WHERE id = old.equipo_id)',
+     _bump('tamano_equipo', f"CAST({_team_size('old.equipo_id')} + 1 AS TEXT)", -1)
+     + _bump('tamano_equipo', f"CAST({_team_size('old.equipo_id')} AS TEXT)", 1)),
+]
+
+def rebuild_statistics(conn):
+    """Recompute every estadistica counter from the data (the triggers keep them current afterwards)"""
+    conn.execute(text("DELETE FROM estadistica"))
+    conn.execute(text("""
+        INSERT INTO estadistica (grupo, clave, valor)
+        SELECT 'total', 'total_pokemon_species', count(*) FROM pokemon_especie
+        UNION ALL SELECT 'total', 'total_pokemon', count(*) FROM pokemon
+        UNION ALL SELECT 'total', 'total_trainers', count(*) FROM entrenador
+        UNION ALL SELECT 'total', 'total_teams', count(*) FROM equipo
+        UNION ALL SELECT 'estado', 'es_legendario', coalesce(sum(es_legendario), 0) FROM pokemon_especie
+        UNION ALL SELECT 'estado', 'es_mitico', coalesce(sum(es_mitico), 0) FROM pokemon_especie
+        UNION ALL SELECT 'estado', 'es_bebe', coalesce(sum(es_bebe), 0) FROM pokemon_especie
+        UNION ALL SELECT 'generacion', coalesce(CAST(generacion AS TEXT), 'unknown'), count(*)
+                  FROM pokemon_especie GROUP BY 1
+        UNION ALL SELECT 'tipo', tipo, count(*) FROM pokemon_especie_tipo GROUP BY tipo
+        UNION ALL SELECT 'tamano_equipo', CAST(tamano AS TEXT), count(*) FROM (
+                  SELECT (SELECT count(*) FROM equipo_pokemon m WHERE m.equipo_id = e.id) AS tamano
+                  FROM equipo e
+              ) GROUP BY tamano
+    """))
+
+def _statistics(conn):
+    # The estadistica table comes from create_all()
+    for name, table, when_event, condition, body in STATISTICS_TRIGGERS:
+        where = f" WHEN {condition}" if condition else ""
+        conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {when_event} ON {table}{where} BEGIN {body}END"))
+    rebuild_statistics(conn)
+
+# (version, name, upgrade(conn)); append only, never renumber
+MIGRATIONS = [
+    (1, 'pokemon_tipos_column', _pokemon_tipos),
+    (2, 'secondary_indexes', _secondary_indexes),
+    (3, 'especie_tipo_relation', _especie_tipo_relation),
+    (4, 'pokemon_stat_columns', _stat_columns),
+    (5, 'search_index', _search_index),
+    (6, 'equipo_pokemon_relation', _equipo_pokemon),
+    (7, 'statistics_counters', _statistics),
+    (8, 'pokemon_nombre_column', _pokemon_nombre),
+]
+
+def current_version(conn):
+    """Highest applied migration (0 for a database that never ran one)"""
+    versions = conn.execute(select(SchemaVersion.version)).scalars().all()
+    return max(versions, default=0)
+
+def migrate(engine, verbose=True):
+    """Apply pending migrations, each in its own transaction. Returns the versions applied."""
+    SchemaVersion.__table__.create(engine, checkfirst=True)
+    applied = []
+    for version, nombre, upgrade in MIGRATIONS:
+        with engine.begin() as conn:
+            if version <= current_version(conn):
+                continue
+            upgrade(conn)
+            conn.execute(SchemaVersion.__table__.insert().values(
+                version=version, nombre=nombre, aplicada=datetime.now().isoformat()
+            ))
+        if verbose:
+            print(f"Applied migration {version}: {nombre}")
+        applied.append(version)
+    return applied
+
+def _query_helpers(db_path):
+    """(name, call) for every read-only query helper, with sample arguments"""
+    from database_queries import DatabaseQueries
+    from pokedex_manager import PokedexManager
+    queries = DatabaseQueries(db_path)
+    pokedex = PokedexManager(db_path)
+    helpers = [
+        ('DatabaseQueries.get_pokemon_by_name', lambda: queries.get_pokemon_by_name('pikachu')),
+        ('DatabaseQueries.get_pokemon_by_type', lambda: queries.get_pokemon_by_type('fire')),
+        ('DatabaseQueries.get_all_pokemon_species', lambda: queries.get_all_pokemon_species(limit=10)),
+        ('DatabaseQueries.get_pokemon_by_generation', lambda: queries.get_pokemon_by_generation(1)),
+        ('DatabaseQueries.get_trainer', lambda: queries.get_trainer('ash')),
+        ('DatabaseQueries.get_trainer_teams', lambda: queries.get_trainer_teams(1)),
+        ('DatabaseQueries.get_team_pokemon', lambda: queries.get_team_pokemon(1)),
+        ('DatabaseQueries.get_teams_with_pokemon', lambda: queries.get_teams_with_pokemon('garchomp')),
+        ('DatabaseQueries.get_most_used_pokemon', queries.get_most_used_pokemon),
+        ('DatabaseQueries.get_stats', queries.get_stats),
+        ('PokedexManager.search_by_name', lambda: pokedex.search_by_name('char')),
+        ('PokedexManager.search_by_type', lambda: pokedex.search_by_type('fire')),
+        ('PokedexManager.search_by_types (all)', lambda: pokedex.search_by_types(['fire', 'flying'])),
+        ('PokedexManager.search_by_types (any)', lambda: pokedex.search_by_types(['water', 'ice'], match_all=False)),
+        ('PokedexManager.search_by_generation', lambda: pokedex.search_by_generation(1)),
+        ('PokedexManager.get_legendary_pokemon', pokedex.get_legendary_pokemon),
+        ('PokedexManager.get_mythical_pokemon', pokedex.get_mythical_pokemon),
+        ('PokedexManager.get_baby_pokemon', pokedex.get_baby_pokemon),
+        ('PokedexManager.get_all_types', pokedex.get_all_types),
+        ('PokedexManager.get_all_generations', pokedex.get_all_generations),
+        ('PokedexManager.get_pokemon_count', pokedex.get_pokemon_count),
+        ('PokedexManager.get_pokemon_by_stat', lambda: pokedex.get_pokemon_by_stat('speed', 100)),
+        ('PokedexManager.get_pokemon_by_stats', lambda: pokedex.get_pokemon_by_stats(
+            {'attack': (100, 255), 'speed': (90, 255)}, order_by='total', limit=10)),
+        ('PokedexManager.get_top_pokemon_by_stat', lambda: pokedex.get_top_pokemon_by_stat('total')),
+        ('PokedexManager.get_pokemon_by_ability', lambda: pokedex.get_pokemon_by_ability('overgrow')),
+        ('PokedexManager.search', lambda: pokedex.search('fire')),
+    ]
+    return helpers, (queries, pokedex)
+
+def report_query_plans(db_path='pokemon.db'):
+    """Run every query helper, capture its SQL and print SQLite's EXPLAIN QUERY PLAN for it.
+
+    Plan lines that still SCAN a table (instead of SEARCH ... USING INDEX)
+    are marked, and the helpers they belong to are returned.
+    """
+    helpers, owners = _query_helpers(db_path)
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            captured.append((statement, parameters))
+
+    scans = []
+    for owner in owners:
+        event.listen(owner.engine, 'before_cursor_execute', capture)
+    try:
+        for name, call in helpers:
+            captured.clear()
+            call()
+            statements = list(captured)
+            print(f"\n{name}")
+            for statement, parameters in statements:
+                with owners[0].engine.connect() as conn:
+                    plan = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+                for row in plan:
+                    detail = row[-1]
+                    # SCAN ... USING (COVERING) INDEX reads an index, not the table rows,
+                    # and SCAN ... VIRTUAL TABLE INDEX is an FTS5 lookup
+                    full_scan = detail.startswith('SCAN') and ' USING ' not in detail and 'VIRTUAL TABLE' not in detail
+                    marker = '  <-- full scan' if full_scan else ''
+                    print(f"  {detail}{marker}")
+                    if marker and name not in scans:
+                        scans.append(name)
+    finally:
+        for owner in owners:
+            event.remove(owner.engine, 'before_cursor_execute', capture)
+            owner.close()
+    return scans
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    db_path = args[0] if args else 'pokemon.db'
+    engine = get_engine(db_path)
+    Base.metadata.create_all(engine)
+    applied = migrate(engine)
+    with engine.connect() as conn:
+        print(f"{db_path}: schema version {current_version(conn)} ({len(applied)} migrations applied)")
+    if '--explain' in sys.argv:
+        scans = report_query_plans(db_path)
+        print(f"\n{len(scans)} helpers still scan a table: {', '.join(scans) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -166,11 +166,13 @@ class Pokedex:
             return especie.crearPokemonNombPoke(nombrePokemon, len(self.listaPokemonEspecie))
         return None
     
-    def obtenerPokemonPorTipos(self, tipos: List[str]) -> List[PokemonEspecie]:
-        """Get Pokemon by types"""
+    def obtenerPokemonPorTipos(self, tipos: List[str], todos: bool = False) -> List[PokemonEspecie]:
+        """Get Pokemon having any of the types (or all of them with todos=True)"""
+        buscados = set(tipos)
         resultado = []
         for pokemon_esp in self.listaPokemonEspecie:
-            if any(t in pokemon_esp.tipo for t in tipos):
+            propios = set(pokemon_esp.tipo)
+            if (buscados <= propios) if todos else (buscados & propios):
                 resultado.append(pokemon_esp)
         return resultado
     
@@ -0,0 +1,75 @@
+"""
+Sorted index of known Pokemon names
+Rejects unknown names locally and backs "did you mean" suggestions
+"""
+
+import difflib
+from bisect import bisect_left
+from typing import Iterable, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from database import get_engine, Pokemon, PokemonEspecie
+
+class NameIndex:
+    """Sorted tuples of names and ids with bisect lookups.
+
+    `completo` marks an index built from a full listing (PokeAPI or a dump):
+    only then does a missing name prove the name does not exist. An index
+    built from a partially loaded database is used for suggestions only.
+    """
+
+    def __init__(self, nombres: Iterable[str], ids: Iterable[int] = (), completo: bool = False):
+        self.nombres = tuple(sorted({nombre.lower() for nombre in nombres if nombre}))
+        self.ids = tuple(sorted(set(ids)))
+        self.completo = completo
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def contiene(self, nombre) -> bool:
+        """Whether a name (or numeric id) is in the index"""
+        clave = str(nombre).strip().lower()
+        if clave.isdigit():
+            return self._en(self.ids, int(clave))
+        return self._en(self.nombres, clave)
+
+    def descarta(self, nombre) -> bool:
+        """True when the index proves `nombre` does not exist (complete index only)"""
+        return self.completo and not self.contiene(nombre)
+
+    def sugerencias(self, nombre: str, n: int = 3) -> List[str]:
+        """Names starting with `nombre`, otherwise the closest spellings"""
+        clave = str(nombre).strip().lower()
+        if not clave or clave.isdigit():
+            return []
+        inicio = bisect_left(self.nombres, clave)
+        prefijo = [nombre for nombre in self.nombres[inicio:inicio + n] if nombre.startswith(clave)]
+        if prefijo:
+            return prefijo
+        return difflib.get_close_matches(clave, self.nombres, n=n, cutoff=0.6)
+
+    @staticmethod
+    def _en(ordenados, valor) -> bool:
+        posicion = bisect_left(ordenados, valor)
+        return posicion < len(ordenados) and ordenados[posicion] == valor
+
+    @classmethod
+    def from_source(cls, source) -> 'NameIndex':
+        """Complete index from the 'pokemon' listing of a PokeAPIClient or LocalDumpSource"""
+        nombres, ids = [], []
+        for nombre, pokemon_id in source.iter_names('pokemon'):
+            nombres.append(nombre)
+            ids.append(pokemon_id)
+        return cls(nombres, ids, completo=True)
+
+    @classmethod
+    def from_database(cls, db_path='pokemon.db') -> Optional['NameIndex']:
+        """Partial index of the Pokemon and species stored in the database (None without a database)"""
+        try:
+            with get_engine(db_path, 'serving').connect() as conn:
+                pokemon = conn.execute(select(func.coalesce(Pokemon.nombre, Pokemon.especie), Pokemon.id_pokemon)).all()
+                especies = conn.execute(select(PokemonEspecie.nombre)).scalars().all()
+        except SQLAlchemyError:
+            return None
+        return cls([nombre for nombre, _ in pokemon] + list(especies),
+                   [pokemon_id for _, pokemon_id in pokemon if pokemon_id is not None])
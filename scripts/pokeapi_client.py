@@ -0,0 +1,115 @@
+"""
+Thin PokeAPI client returning raw JSON documents
+Thread-safe so it can be shared by concurrent ingestion workers
+"""
+
+import threading
+import time
+import requests
+from response_cache import ResponseCache, DEFAULT_CACHE_PATH
+from single_flight import SingleFlight
+
+DEFAULT_BASE_URL = "https://pokeapi.co/api/v2"
+NEGATIVE_TTL = 60 * 60  # Remember 404s for 1 hour
+
+class PokeAPIClient:
+    """Fetch raw PokeAPI resources over HTTP, optionally through a response cache.
+
+    Concurrent requests for the same resource are coalesced into one HTTP
+    call whose document (or error) every caller shares. Resources that
+    returned 404 are remembered for `negative_ttl` seconds and rejected
+    without a request.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, timeout=30, cache=None, offline=False,
+                 negative_ttl=NEGATIVE_TTL):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cache = cache
+        self.offline = offline
+        self.negative_ttl = negative_ttl
+        self.calls = 0
+        self.negative_hits = 0
+        self._not_found = {}  # (endpoint, key) -> expiry time
+        self.flights = SingleFlight()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _get_http_session(self):
+        """Return the requests session owned by the current thread"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def get(self, endpoint, id_or_name):
+        """Fetch a single resource, e.g. get('pokemon', 25) or get('move', 'tackle')"""
+        key = str(id_or_name).strip().lower()
+        if self._is_known_missing(endpoint, key):
+            raise LookupError(f"{endpoint}/{key} was not found")
+        if self.cache is not None:
+            data = self.cache.get(endpoint, key, allow_stale=self.offline)
+            if data is not None:
+                return data
+        if self.offline:
+            raise LookupError(f"{endpoint}/{key} is not available offline")
+        return self.flights.do((endpoint, key), lambda: self._fetch(endpoint, key))
+
+    def _fetch(self, endpoint, key):
+        url = f"{self.base_url}/{endpoint}/{key}/"
+        with self._lock:
+            self.calls += 1
+        response = self._get_http_session().get(url, timeout=self.timeout)
+        if response.status_code == 404:
+            with self._lock:
+                self._not_found[(endpoint, key)] = time.time() + self.negative_ttl
+        response.raise_for_status()
+        data = response.json()
+
+        if self.cache is not None:
+            # Store under both id and name so either lookup hits next time
+            self.cache.put(endpoint, key, data, aliases=(data.get('id'), data.get('name')))
+        return data
+
+    def _is_known_missing(self, endpoint, key):
+        with self._lock:
+            expires_at = self._not_found.get((endpoint, key))
+            if expires_at is None:
+                return False
+            if expires_at < time.time():
+                del self._not_found[(endpoint, key)]
+                return False
+            self.negative_hits += 1
+            return True
+
+    def iter_ids(self, endpoint):
+        """Yield every numeric id listed by an endpoint"""
+        for _, resource_id in self.iter_names(endpoint):
+            yield resource_id
+
+    def iter_names(self, endpoint):
+        """Yield (name, id) for every resource listed by an endpoint"""
+        for result in self._list(endpoint):
+            yield result['name'], int(result['url'].rstrip('/').split('/')[-1])
+
+    def _list(self, endpoint):
+        """The endpoint's full listing, kept in the response cache like any document"""
+        if self.cache is not None:
+            listing = self.cache.get(endpoint, '_list', allow_stale=self.offline)
+            if listing is not None:
+                return listing['results']
+        if self.offline:
+            raise LookupError(f"{endpoint} listing is not available offline")
+        response = self._get_http_session().get(
+            f"{self.base_url}/{endpoint}/", params={'limit': 100000}, timeout=self.timeout
+        )
+        response.raise_for_status()
+        listing = response.json()
+        if self.cache is not None:
+            self.cache.put(endpoint, '_list', listing)
+        return listing['results']
+
+def create_default_client(cache_path=DEFAULT_CACHE_PATH, offline=False):
+    """Client used by the loader and the integration, sharing one on-disk cache"""
+    return PokeAPIClient(cache=ResponseCache(cache_path), offline=offline)
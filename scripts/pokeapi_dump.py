@@ -0,0 +1,91 @@
+"""
+Offline PokeAPI source reading a local api-data dump
+Drop-in replacement for PokeAPIClient so the loader and the integration can
+run without network access
+"""
+
+import json
+import os
+import threading
+
+class LocalDumpSource:
+    """Read PokeAPI documents from a local copy of the PokeAPI/api-data layout.
+
+    `root` may be the api-data checkout itself or any directory containing
+    `api/v2/<endpoint>/<id>/index.json`. Documents are read from disk on
+    demand and never kept in memory.
+    """
+
+    def __init__(self, root):
+        self.root = self._find_api_root(root)
+        self.cache = None  # Same interface as PokeAPIClient; no response cache needed
+        self.offline = True
+        self.calls = 0
+        self._name_index = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _find_api_root(root):
+        """Locate the api/v2 directory inside `root`"""
+        for candidate in (root, os.path.join(root, 'v2'), os.path.join(root, 'api', 'v2'),
+                          os.path.join(root, 'data', 'api', 'v2')):
+            if os.path.isdir(os.path.join(candidate, 'pokemon')):
+                return candidate
+        raise FileNotFoundError(f"No PokeAPI dump (api/v2/pokemon) found under {root}")
+
+    def get(self, endpoint, id_or_name):
+        """Read a single resource document, e.g. get('pokemon', 25) or get('move', 'tackle')"""
+        key = str(id_or_name).strip().lower()
+        if not key.isdigit():
+            key = self._name_to_id(endpoint, key)
+        path = os.path.join(self.root, endpoint, key, 'index.json')
+        with self._lock:
+            self.calls += 1
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise LookupError(f"{endpoint}/{id_or_name} is not in the dump") from None
+
+    def iter_ids(self, endpoint):
+        """Yield the numeric ids available for an endpoint in ascending order"""
+        directory = os.path.join(self.root, endpoint)
+        ids = sorted(int(entry.name) for entry in os.scandir(directory)
+                     if entry.is_dir() and entry.name.isdigit())
+        yield from ids
+
+    def iter_names(self, endpoint):
+        """Yield (name, id) for every resource of an endpoint"""
+        for name, resource_id in self._names(endpoint).items():
+            yield name, int(resource_id)
+
+    def _names(self, endpoint):
+        """The endpoint's name -> id map, built once"""
+        with self._lock:
+            index = self._name_index.get(endpoint)
+        if index is None:
+            index = self._build_name_index(endpoint)
+            with self._lock:
+                self._name_index[endpoint] = index
+        return index
+
+    def _name_to_id(self, endpoint, name):
+        """Resolve a resource name to its id through the endpoint's index.json"""
+        try:
+            return self._names(endpoint)[name]
+        except KeyError:
+            raise LookupError(f"{endpoint}/{name} is not in the dump") from None
+
+    def _build_name_index(self, endpoint):
+        """Map names to ids from the endpoint list document (or each document as fallback)"""
+        index_path = os.path.join(self.root, endpoint, 'index.json')
+        if os.path.exists(index_path):
+            with open(index_path, encoding='utf-8') as f:
+                results = json.load(f).get('results', [])
+            return {r['name']: r['url'].rstrip('/').split('/')[-1] for r in results if 'name' in r}
+
+        index = {}
+        for resource_id in self.iter_ids(endpoint):
+            with open(os.path.join(self.root, endpoint, str(resource_id), 'index.json'), encoding='utf-8') as f:
+                index[json.load(f).get('name')] = str(resource_id)
+        return index
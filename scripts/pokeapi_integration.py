@@ -1,170 +1,565 @@
 """
-PokeAPI Integration using Pokebase
+PokeAPI Integration
 Fetches Pokemon data and populates the domain models
 """
 
-import pokebase as pb
-from typing import Optional, List, Dict
+import asyncio
+import threading
+import weakref
+from collections import deque
+from collections.abc import Sequence
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Callable, Iterable, Iterator, AsyncIterator
+from pokeapi_client import create_default_client
+from memory_cache import MemoryCache
+from database_lookup import DatabaseLookup
+from name_index import NameIndex
 from models import (
-    PokemonEspecie, Ataque, Habilidad, Pokedex, 
+    PokemonEspecie, Ataque, Habilidad, Pokedex,
     GestorPokedex, Pokemon
 )
 
+class AtaquesPerezosos(Sequence):
+    """Move list that fetches its Ataque objects on first access.
+
+    Holds only the move names until the list is read; the first read loads
+    every move in one batch through `cargar(nombres) -> {nombre: Ataque}`.
+    Moves that cannot be fetched are left out, like the eager conversion.
+    Pickling keeps the loaded moves, or only the names if never loaded.
+    """
+
+    def __init__(self, nombres: Iterable[str], cargar: Optional[Callable[[List[str]], Dict[str, Ataque]]]):
+        self.nombres = list(nombres)
+        self._cargar = cargar
+        self._ataques: Optional[List[Ataque]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def cargado(self) -> bool:
+        return self._ataques is not None
+
+    def _resolver(self) -> List[Ataque]:
+        if self._ataques is None:
+            with self._lock:
+                if self._ataques is None:
+                    ataques = self._cargar(self.nombres) if self._cargar else {}
+                    self._ataques = [ataques[nombre] for nombre in self.nombres if nombre in ataques]
+        return self._ataques
+
+    def __getitem__(self, index):
+        return self._resolver()[index]
+
+    def __len__(self):
+        return len(self._resolver())
+
+    def __iter__(self):
+        return iter(self._resolver())
+
+    def __eq__(self, other):
+        if isinstance(other, (list, AtaquesPerezosos)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def copy(self) -> 'AtaquesPerezosos':
+        """Independent list over the same moves, still lazy if this one is"""
+        copia = AtaquesPerezosos(self.nombres, self._cargar)
+        if self._ataques is not None:
+            copia._ataques = list(self._ataques)
+        return copia
+
+    def __repr__(self):
+        if self._ataques is None:
+            return f"AtaquesPerezosos({self.nombres!r}, not loaded)"
+        return repr(self._ataques)
+
+    def __getstate__(self):
+        return {'nombres': self.nombres, 'ataques': self._ataques}
+
+    def __setstate__(self, state):
+        self.nombres = state['nombres']
+        self._ataques = state['ataques']
+        self._cargar = None
+        self._lock = threading.Lock()
+
 class PokeAPIIntegration:
-    """Integrates with PokeAPI via pokebase"""
-    
-    def __init__(self):
-        self.cache: Dict = {}
-    
+    """Integrates with PokeAPI through the shared cached client.
+
+    Lookups are tiered: the in-memory cache, then (with `db_path`) the
+    pokemon.db tables filled by PokeAPILoader, then PokeAPI. Species that
+    come from the network are written back to the database in the background.
+    Names missing from the full PokeAPI (or dump) name index, and names that
+    returned 404 before, are rejected without a network request.
+    """
+
+    def __init__(self, client=None, max_workers: int = 8, cache: Optional[MemoryCache] = None,
+                 db_path: Optional[str] = None):
+        self.client = client or create_default_client()
+        self.max_workers = max_workers
+        self.cache = cache if cache is not None else MemoryCache()
+        self.db = DatabaseLookup(db_path, self.client) if db_path else None
+        self.rechazados = 0
+        self._indice: Optional[NameIndex] = None
+        self._indice_lock = threading.Lock()
+
     def obtenerPokemonEspecie(self, nombre: str) -> Optional[PokemonEspecie]:
         """Fetch Pokemon species from PokeAPI"""
-        try:
-            # Get Pokemon from PokeAPI
-            pokemon_api = pb.pokemon.get(nombre.lower())
-            
-            # Extract types
-            tipos = [t.type.name for t in pokemon_api.types]
-            
-            # Extract abilities
-            habilidades = []
-            for ability_slot in pokemon_api.abilities:
-                habilidad = Habilidad(
-                    nombre=ability_slot.ability.name,
-                    descripcion=f"Ability: {ability_slot.ability.name}"
-                )
-                habilidades.append(habilidad)
-            
-            # Extract moves
-            ataques = []
-            for move_slot in pokemon_api.moves[:10]:  # Limit to first 10 moves
-                move = pb.move.get(move_slot.move.name)
-                ataque = Ataque(
-                    nombre=move.name,
-                    descripcion=move.effect_entries[0].effect if move.effect_entries else "No description",
-                    tipo=move.type.name if move.type else "unknown",
-                    potencia=move.power,
-                    precision=move.accuracy,
-                    pp=move.pp
-                )
-                ataques.append(ataque)
-            
-            # Create species object
-            especie = PokemonEspecie(
-                orden=pokemon_api.id,
-                nombre=pokemon_api.name,
-                tipo=tipos,
-                rangoGenero=50.0,  # Default value
-                peso=pokemon_api.weight / 10.0,  # Convert to kg
-                altura=pokemon_api.height / 10.0,  # Convert to m
-                listaHabilidades=habilidades,
-                listaAtaques=ataques,
-                imagen=pokemon_api.sprites.front_default,
-                fotos=[pokemon_api.sprites.front_default, pokemon_api.sprites.back_default]
-            )
-            
-            return especie
-        except Exception as e:
-            print(f"Error fetching Pokemon {nombre}: {e}")
-            return None
-    
+        especies = self.obtenerMultiplesPokemon([nombre])
+        return especies[0] if especies else None
+
     def obtenerMultiplesPokemon(self, nombres: List[str]) -> List[PokemonEspecie]:
-        """Fetch multiple Pokemon species"""
-        especies = []
-        for nombre in nombres:
-            especie = self.obtenerPokemonEspecie(nombre)
-            if especie:
-                especies.append(especie)
-        return especies
-    
+        """Fetch multiple Pokemon species from memory, the database or PokeAPI, in that order"""
+        especies = self._especiesEnMemoria(nombres)
+        faltan = [nombre for nombre in nombres if self._clave(nombre) not in especies]
+        if faltan:
+            especies.update(self._especiesEnBaseDatos(faltan))
+            faltan = self._descartarInexistentes([nombre for nombre in faltan if self._clave(nombre) not in especies])
+        if faltan:
+            especies.update(self._indexarEspecies(self._convertirLote(self._obtenerDocumentosPokemon(faltan))))
+        return self._ordenarEspecies(nombres, especies)
+
     def obtenerPokemonPorTipo(self, tipo: str) -> List[PokemonEspecie]:
-        """Fetch Pokemon by type"""
+        """Fetch Pokemon by type (first 20)"""
+        return list(self.iterarPokemonPorTipo(tipo, limit=20))
+
+    def obtenerGeneracion(self, numero_generacion: int) -> List[PokemonEspecie]:
+        """Fetch Pokemon from a generation (first 20)"""
+        return list(self.iterarGeneracion(numero_generacion, limit=20))
+
+    def iterarPokemonPorTipo(self, tipo: str, offset: int = 0, limit: Optional[int] = None) -> Iterator[PokemonEspecie]:
+        """Yield the Pokemon of a type in order as they are converted, from `offset`, at most `limit`"""
+        return self._iterarEspecies(self._nombresPorTipo(tipo)[offset:self._fin(offset, limit)])
+
+    def iterarGeneracion(self, numero_generacion: int, offset: int = 0,
+                         limit: Optional[int] = None) -> Iterator[PokemonEspecie]:
+        """Yield the Pokemon of a generation in order as they are converted, from `offset`, at most `limit`"""
+        return self._iterarEspecies(self._nombresGeneracion(numero_generacion)[offset:self._fin(offset, limit)])
+
+    def paginaPokemonPorTipo(self, tipo: str, offset: int = 0, limit: int = 10) -> Dict:
+        """One page of a type: {'resultados', 'offset', 'limit', 'total', 'siguiente'}"""
+        nombres = self._nombresPorTipo(tipo)
+        return self._pagina(nombres, list(self._iterarEspecies(nombres[offset:offset + limit])), offset, limit)
+
+    def paginaGeneracion(self, numero_generacion: int, offset: int = 0, limit: int = 10) -> Dict:
+        """One page of a generation: {'resultados', 'offset', 'limit', 'total', 'siguiente'}"""
+        nombres = self._nombresGeneracion(numero_generacion)
+        return self._pagina(nombres, list(self._iterarEspecies(nombres[offset:offset + limit])), offset, limit)
+
+    def _nombresPorTipo(self, tipo: str) -> List[str]:
+        """Names of every Pokemon of a type, or [] if the type cannot be fetched"""
         try:
-            tipo_obj = pb.type_.get(tipo.lower())
-            especies = []
-            
-            # Get Pokemon of this type (limit to first 20)
-            for pokemon_ref in tipo_obj.pokemon[:20]:
-                pokemon_data = pb.pokemon.get(pokemon_ref.pokemon.name)
-                especie = self._convertir_pokemon_api_a_especie(pokemon_data)
-                if especie:
-                    especies.append(especie)
-            
-            return especies
+            tipo_obj = self.client.get('type', tipo.lower())
         except Exception as e:
             print(f"Error fetching Pokemon of type {tipo}: {e}")
             return []
-    
-    def obtenerGeneracion(self, numero_generacion: int) -> List[PokemonEspecie]:
-        """Fetch all Pokemon from a generation"""
+        return [ref['pokemon']['name'] for ref in tipo_obj['pokemon']]
+
+    def _nombresGeneracion(self, numero_generacion: int) -> List[str]:
+        """Names of every species of a generation, or [] if it cannot be fetched"""
         try:
-            generation = pb.generation.get(numero_generacion)
-            especies = []
-            
-            for species_ref in generation.pokemon_species[:20]:  # Limit for demo
-                pokemon_data = pb.pokemon.get(species_ref.name)
-                especie = self._convertir_pokemon_api_a_especie(pokemon_data)
-                if especie:
-                    especies.append(especie)
-            
-            return especies
+            generation = self.client.get('generation', numero_generacion)
         except Exception as e:
             print(f"Error fetching generation {numero_generacion}: {e}")
             return []
-    
-    def _convertir_pokemon_api_a_especie(self, pokemon_api) -> Optional[PokemonEspecie]:
-        """Convert PokeAPI Pokemon to domain model"""
+        return [ref['name'] for ref in generation['pokemon_species']]
+
+    @staticmethod
+    def _fin(offset: int, limit: Optional[int]) -> Optional[int]:
+        return None if limit is None else offset + limit
+
+    @staticmethod
+    def _pagina(nombres: List[str], resultados: List[PokemonEspecie], offset: int, limit: int) -> Dict:
+        siguiente = offset + limit
+        return {
+            'resultados': resultados,
+            'offset': offset,
+            'limit': limit,
+            'total': len(nombres),
+            'siguiente': siguiente if siguiente < len(nombres) else None
+        }
+
+    def _iterarEspecies(self, nombres: Iterable[str]) -> Iterator[PokemonEspecie]:
+        """Convert species in input order, keeping at most `max_workers` fetches in flight"""
+        nombres = iter(nombres)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
         try:
-            tipos = [t.type.name for t in pokemon_api.types]
-            
-            habilidades = []
-            for ability_slot in pokemon_api.abilities:
-                habilidad = Habilidad(
-                    nombre=ability_slot.ability.name,
-                    descripcion=f"Ability: {ability_slot.ability.name}"
-                )
-                habilidades.append(habilidad)
-            
-            ataques = []
-            for move_slot in pokemon_api.moves[:10]:
+            pendientes = deque(executor.submit(self._cargarEspecie, nombre)
+                               for nombre in islice(nombres, self.max_workers))
+            while pendientes:
+                especie = pendientes.popleft().result()
+                for nombre in islice(nombres, 1):
+                    pendientes.append(executor.submit(self._cargarEspecie, nombre))
+                if especie:
+                    yield especie
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _cargarEspecie(self, nombre: str) -> Optional[PokemonEspecie]:
+        """Single species from memory, the database or the client"""
+        especie = self.cache.get('especie', nombre) or self._especiesEnBaseDatos([nombre]).get(self._clave(nombre))
+        if especie or not self._descartarInexistentes([nombre]):
+            return especie
+        try:
+            pokemon_api = self.client.get('pokemon', self._clave(nombre))
+        except Exception as e:
+            print(f"Error fetching Pokemon {nombre}: {e}")
+            return None
+        return self._convertir_pokemon_api_a_especie(pokemon_api)
+
+    def indiceNombres(self) -> NameIndex:
+        """Index of valid Pokemon names, built once from the client's listing.
+
+        Falls back to the names stored in the database (suggestions only)
+        when the listing cannot be fetched, e.g. offline without a cached copy.
+        """
+        with self._indice_lock:
+            if self._indice is None:
                 try:
-                    move = pb.move.get(move_slot.move.name)
-                    ataque = Ataque(
-                        nombre=move.name,
-                        descripcion=move.effect_entries[0].effect if move.effect_entries else "No description",
-                        tipo=move.type.name if move.type else "unknown",
-                        potencia=move.power,
-                        precision=move.accuracy,
-                        pp=move.pp
+                    self._indice = NameIndex.from_source(self.client)
+                except Exception:
+                    self._indice = (NameIndex.from_database(self.db.db_path) if self.db is not None else None) \
+                        or NameIndex([])
+            return self._indice
+
+    def sugerirNombres(self, nombre: str, n: int = 3) -> List[str]:
+        """'Did you mean' candidates for a name that was not found"""
+        return self.indiceNombres().sugerencias(nombre, n)
+
+    def _descartarInexistentes(self, nombres: List[str]) -> List[str]:
+        """Drop names the complete name index proves do not exist"""
+        if not nombres:
+            return nombres
+        indice = self.indiceNombres()
+        validos = [nombre for nombre in nombres if not indice.descarta(nombre)]
+        with self._indice_lock:
+            self.rechazados += len(nombres) - len(validos)
+        return validos
+
+    @staticmethod
+    def _clave(nombre) -> str:
+        return str(nombre).strip().lower()
+
+    def _especiesEnMemoria(self, nombres: List[str]) -> Dict[str, PokemonEspecie]:
+        """Species already memoized, keyed by the normalized requested name"""
+        especies = {}
+        for nombre in nombres:
+            especie = self.cache.get('especie', nombre)
+            if especie:
+                especies[self._clave(nombre)] = especie
+        return especies
+
+    def _especiesEnBaseDatos(self, nombres: List[str]) -> Dict[str, PokemonEspecie]:
+        """Species stored in pokemon.db (memoized as they are read), keyed by the normalized requested name"""
+        if self.db is None:
+            return {}
+        especies = self.db.obtenerEspecies(nombres, lambda ataques: AtaquesPerezosos(ataques, self._obtenerAtaques))
+        for especie in especies.values():
+            self.cache.put('especie', especie.nombre, especie, aliases=(especie.orden,))
+        return especies
+
+    def _indexarEspecies(self, especies: List[PokemonEspecie]) -> Dict[str, PokemonEspecie]:
+        """Index freshly converted species by name and by id"""
+        return {clave: especie for especie in especies for clave in (especie.nombre.lower(), str(especie.orden))}
+
+    def _ordenarEspecies(self, nombres: List[str], especies: Dict[str, PokemonEspecie]) -> List[PokemonEspecie]:
+        """Species in the requested order, skipping names that could not be resolved"""
+        return [especies[self._clave(nombre)] for nombre in nombres if self._clave(nombre) in especies]
+
+    def _ataquesEnMemoria(self, nombres) -> Dict[str, Ataque]:
+        ataques = {}
+        for nombre in nombres:
+            ataque = self.cache.get('ataque', nombre)
+            if ataque:
+                ataques[nombre] = ataque
+        return ataques
+
+    def _obtenerDocumentosPokemon(self, nombres: List[str]) -> List[Dict]:
+        """Fetch the raw Pokemon documents concurrently, keeping the input order"""
+        def obtener(nombre):
+            try:
+                return self.client.get('pokemon', nombre.lower())
+            except Exception as e:
+                print(f"Error fetching Pokemon {nombre}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return [doc for doc in executor.map(obtener, nombres) if doc]
+
+    def _obtenerAtaques(self, nombres: Iterable[str]) -> Dict[str, Ataque]:
+        """Fetch a batch of moves concurrently, serving memoized and stored ones first"""
+        nombres = set(nombres)
+        ataques = self._ataquesEnMemoria(nombres)
+        faltan = [nombre for nombre in nombres if nombre not in ataques]
+        if faltan and self.db is not None:
+            for nombre, ataque in self.db.obtenerAtaques(faltan).items():
+                self.cache.put('ataque', nombre, ataque)
+                ataques[nombre] = ataque
+            faltan = [nombre for nombre in faltan if nombre not in ataques]
+
+        def obtener(nombre):
+            try:
+                return self._convertir_move_a_ataque(self.client.get('move', nombre))
+            except Exception:
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            ataques.update(zip(faltan, executor.map(obtener, faltan)))
+        return {nombre: ataque for nombre, ataque in ataques.items() if ataque}
+
+    def _convertirLote(self, pokemon_docs: List[Dict]) -> List[PokemonEspecie]:
+        """Convert a batch of Pokemon documents; their moves load lazily on first access"""
+        especies = []
+        for pokemon_api in pokemon_docs:
+            especie = self._convertir_pokemon_api_a_especie(pokemon_api)
+            if especie:
+                especies.append(especie)
+        return especies
+
+    def _convertir_pokemon_api_a_especie(self, pokemon_api,
+                                         ataques_prefetch: Optional[Dict[str, Ataque]] = None) -> Optional[PokemonEspecie]:
+        """Convert PokeAPI Pokemon to domain model.
+
+        Moves are resolved from `ataques_prefetch` when given; otherwise
+        `listaAtaques` is an AtaquesPerezosos that fetches them on first use.
+        """
+        try:
+            tipos = [t['type']['name'] for t in pokemon_api['types']]
+
+            habilidades = []
+            for ability_slot in pokemon_api['abilities']:
+                nombre_habilidad = ability_slot['ability']['name']
+                habilidad = self.cache.get('habilidad', nombre_habilidad)
+                if habilidad is None:
+                    habilidad = Habilidad(
+                        nombre=nombre_habilidad,
+                        descripcion=f"Ability: {nombre_habilidad}"
                     )
-                    ataques.append(ataque)
-                except:
-                    pass
-            
+                    self.cache.put('habilidad', nombre_habilidad, habilidad)
+                habilidades.append(habilidad)
+
+            nombres_ataques = [slot['move']['name'] for slot in pokemon_api['moves'][:10]]  # Limit to first 10 moves
+            if ataques_prefetch is not None:
+                ataques = [ataques_prefetch[nombre] for nombre in nombres_ataques if nombre in ataques_prefetch]
+            else:
+                ataques = AtaquesPerezosos(nombres_ataques, self._obtenerAtaques)
+
+            sprites = pokemon_api['sprites']
             especie = PokemonEspecie(
-                orden=pokemon_api.id,
-                nombre=pokemon_api.name,
+                orden=pokemon_api['id'],
+                nombre=pokemon_api['name'],
                 tipo=tipos,
-                rangoGenero=50.0,
-                peso=pokemon_api.weight / 10.0,
-                altura=pokemon_api.height / 10.0,
+                rangoGenero=50.0,  # Default value
+                peso=pokemon_api['weight'] / 10.0,  # Convert to kg
+                altura=pokemon_api['height'] / 10.0,  # Convert to m
                 listaHabilidades=habilidades,
                 listaAtaques=ataques,
-                imagen=pokemon_api.sprites.front_default,
-                fotos=[pokemon_api.sprites.front_default, pokemon_api.sprites.back_default]
+                imagen=sprites.get('front_default'),
+                fotos=[sprites.get('front_default'), sprites.get('back_default')]
             )
-            
+
+            self.cache.put('especie', especie.nombre, especie, aliases=(especie.orden,))
+            if self.db is not None:
+                self.db.guardar(especie.orden)
             return especie
         except Exception as e:
             print(f"Error converting Pokemon: {e}")
             return None
-    
+
+    def _convertir_move_a_ataque(self, move) -> Ataque:
+        """Convert PokeAPI move data to domain model"""
+        ataque = Ataque(
+            nombre=move['name'],
+            descripcion=move['effect_entries'][0]['effect'] if move.get('effect_entries') else "No description",
+            tipo=move['type']['name'] if move.get('type') else "unknown",
+            potencia=move.get('power'),
+            precision=move.get('accuracy'),
+            pp=move.get('pp')
+        )
+        self.cache.put('ataque', ataque.nombre, ataque)
+        return ataque
+
     def crearPokedex(self, nombre: str, pokemon_nombres: List[str]) -> Pokedex:
         """Create a Pokedex with Pokemon species"""
         pokedex = Pokedex(nombre=nombre)
-        
-        for pokemon_nombre in pokemon_nombres:
-            especie = self.obtenerPokemonEspecie(pokemon_nombre)
+        pokedex.listaPokemonEspecie.extend(self.obtenerMultiplesPokemon(pokemon_nombres))
+        return pokedex
+
+    def estadisticasCache(self) -> Dict:
+        """Response cache hit/miss statistics"""
+        if self.client.cache is None:
+            return {}
+        return self.client.cache.stats()
+
+    def estadisticasNombresInexistentes(self) -> Dict:
+        """Lookups rejected locally by the name index or the client's 404 cache"""
+        return {
+            'rechazados_indice': self.rechazados,
+            'rechazados_404': getattr(self.client, 'negative_hits', 0),
+            'nombres_indice': len(self._indice) if self._indice is not None else 0,
+            'indice_completo': self._indice is not None and self._indice.completo
+        }
+
+    def estadisticasCoalescencia(self) -> Dict:
+        """Single-flight counters of the client (executed vs coalesced fetches)"""
+        flights = getattr(self.client, 'flights', None)
+        return flights.stats() if flights is not None else {}
+
+    def estadisticasBaseDatos(self) -> Dict:
+        """Database tier hits/misses and write-backs"""
+        return self.db.estadisticas() if self.db is not None else {}
+
+    def estadisticasMemoria(self) -> Dict:
+        """In-memory object cache statistics per kind"""
+        return self.cache.stats()
+
+class AsyncPokeAPIIntegration(PokeAPIIntegration):
+    """Asyncio counterpart of PokeAPIIntegration.
+
+    The public lookups are coroutines returning the same domain models.
+    Species and move fetches fan out with asyncio.gather, bounded by a
+    semaphore of `max_concurrency` requests. The blocking client (HTTP,
+    cache or local dump) runs on a dedicated thread pool of the same size.
+    Moves of species fetched from PokeAPI are loaded eagerly here, since a
+    lazy load would block the loop; species read from the database keep
+    their lazy (database-first) move lists. Each event loop gets its own
+    semaphore, so one instance can serve several asyncio.run() calls;
+    failed species and move fetches are counted in `errores`.
+    """
+
+    def __init__(self, client=None, max_concurrency: int = 64, cache: Optional[MemoryCache] = None,
+                 db_path: Optional[str] = None):
+        super().__init__(client, max_workers=max_concurrency, cache=cache, db_path=db_path)
+        self.max_concurrency = max_concurrency
+        self.errores = 0
+        self._semaforos = weakref.WeakKeyDictionary()  # event loop -> its semaphore
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def _semaforo(self) -> asyncio.Semaphore:
+        """Semaphore of the running loop; a semaphore cannot be shared across loops"""
+        loop = asyncio.get_running_loop()
+        semaforo = self._semaforos.get(loop)
+        if semaforo is None:
+            semaforo = self._semaforos[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaforo
+
+    async def _get(self, endpoint: str, key):
+        async with self._semaforo():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self.client.get, endpoint, key)
+
+    async def obtenerPokemonEspecie(self, nombre: str) -> Optional[PokemonEspecie]:
+        """Fetch Pokemon species from PokeAPI"""
+        especies = await self.obtenerMultiplesPokemon([nombre])
+        return especies[0] if especies else None
+
+    async def obtenerMultiplesPokemon(self, nombres: List[str]) -> List[PokemonEspecie]:
+        """Fetch all missing species at once, then the union of their missing moves at once"""
+        especies = self._especiesEnMemoria(nombres)
+        faltan = [nombre for nombre in nombres if self._clave(nombre) not in especies]
+        if faltan and self.db is not None:
+            loop = asyncio.get_running_loop()
+            especies.update(await loop.run_in_executor(self._executor, self._especiesEnBaseDatos, faltan))
+            faltan = [nombre for nombre in faltan if self._clave(nombre) not in especies]
+        if faltan:
+            loop = asyncio.get_running_loop()
+            faltan = await loop.run_in_executor(self._executor, self._descartarInexistentes, faltan)
+        if not faltan:
+            return self._ordenarEspecies(nombres, especies)
+
+        respuestas = await asyncio.gather(
+            *(self._get('pokemon', nombre.lower()) for nombre in faltan), return_exceptions=True
+        )
+        pokemon_docs = []
+        for nombre, respuesta in zip(faltan, respuestas):
+            if isinstance(respuesta, Exception):
+                self.errores += 1
+                print(f"Error fetching Pokemon {nombre}: {respuesta}")
+            else:
+                pokemon_docs.append(respuesta)
+
+        nombres_ataques = {slot['move']['name'] for doc in pokemon_docs for slot in doc['moves'][:10]}
+        ataques = self._ataquesEnMemoria(nombres_ataques)
+        faltan_ataques = [nombre for nombre in nombres_ataques if nombre not in ataques]
+        moves = await asyncio.gather(
+            *(self._get('move', nombre) for nombre in faltan_ataques), return_exceptions=True
+        )
+        for nombre, move in zip(faltan_ataques, moves):
+            if isinstance(move, Exception):
+                self.errores += 1
+                print(f"Error fetching move {nombre}: {move}")
+            else:
+                ataques[nombre] = self._convertir_move_a_ataque(move)
+
+        nuevas = []
+        for pokemon_api in pokemon_docs:
+            especie = self._convertir_pokemon_api_a_especie(pokemon_api, ataques)
             if especie:
-                pokedex.listaPokemonEspecie.append(especie)
-        
+                nuevas.append(especie)
+        especies.update(self._indexarEspecies(nuevas))
+        return self._ordenarEspecies(nombres, especies)
+
+    async def obtenerPokemonPorTipo(self, tipo: str) -> List[PokemonEspecie]:
+        """Fetch Pokemon by type (first 20)"""
+        nombres = await self._nombresAsync(self._nombresPorTipo, tipo)
+        return await self.obtenerMultiplesPokemon(nombres[:20])
+
+    async def obtenerGeneracion(self, numero_generacion: int) -> List[PokemonEspecie]:
+        """Fetch Pokemon from a generation (first 20)"""
+        nombres = await self._nombresAsync(self._nombresGeneracion, numero_generacion)
+        return await self.obtenerMultiplesPokemon(nombres[:20])
+
+    async def iterarPokemonPorTipo(self, tipo: str, offset: int = 0,
+                                   limit: Optional[int] = None) -> AsyncIterator[PokemonEspecie]:
+        """Async generator over the Pokemon of a type, in order, from `offset`, at most `limit`"""
+        nombres = await self._nombresAsync(self._nombresPorTipo, tipo)
+        async for especie in self._iterarEspeciesAsync(nombres[offset:self._fin(offset, limit)]):
+            yield especie
+
+    async def iterarGeneracion(self, numero_generacion: int, offset: int = 0,
+                               limit: Optional[int] = None) -> AsyncIterator[PokemonEspecie]:
+        """Async generator over the Pokemon of a generation, in order, from `offset`, at most `limit`"""
+        nombres = await self._nombresAsync(self._nombresGeneracion, numero_generacion)
+        async for especie in self._iterarEspeciesAsync(nombres[offset:self._fin(offset, limit)]):
+            yield especie
+
+    async def paginaPokemonPorTipo(self, tipo: str, offset: int = 0, limit: int = 10) -> Dict:
+        """One page of a type: {'resultados', 'offset', 'limit', 'total', 'siguiente'}"""
+        nombres = await self._nombresAsync(self._nombresPorTipo, tipo)
+        return self._pagina(nombres, await self.obtenerMultiplesPokemon(nombres[offset:offset + limit]), offset, limit)
+
+    async def paginaGeneracion(self, numero_generacion: int, offset: int = 0, limit: int = 10) -> Dict:
+        """One page of a generation: {'resultados', 'offset', 'limit', 'total', 'siguiente'}"""
+        nombres = await self._nombresAsync(self._nombresGeneracion, numero_generacion)
+        return self._pagina(nombres, await self.obtenerMultiplesPokemon(nombres[offset:offset + limit]), offset, limit)
+
+    async def _nombresAsync(self, obtener_nombres, clave) -> List[str]:
+        async with self._semaforo():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, obtener_nombres, clave)
+
+    async def _iterarEspeciesAsync(self, nombres: List[str]) -> AsyncIterator[PokemonEspecie]:
+        """Yield species in input order with a bounded window of conversions in flight"""
+        ventana = max(1, self.max_concurrency // 4)  # Leave room for each species' move fetches
+        nombres = iter(nombres)
+        pendientes = deque(asyncio.ensure_future(self.obtenerPokemonEspecie(nombre))
+                           for nombre in islice(nombres, ventana))
+        try:
+            while pendientes:
+                especie = await pendientes.popleft()
+                for nombre in islice(nombres, 1):
+                    pendientes.append(asyncio.ensure_future(self.obtenerPokemonEspecie(nombre)))
+                if especie:
+                    yield especie
+        finally:
+            for tarea in pendientes:
+                tarea.cancel()
+
+    async def crearPokedex(self, nombre: str, pokemon_nombres: List[str]) -> Pokedex:
+        """Create a Pokedex with Pokemon species"""
+        pokedex = Pokedex(nombre=nombre)
+        pokedex.listaPokemonEspecie.extend(await self.obtenerMultiplesPokemon(pokemon_nombres))
         return pokedex
+
+    def close(self):
+        """Release the worker threads"""
+        self._executor.shutdown(wait=False)
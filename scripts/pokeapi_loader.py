@@ -1,144 +1,576 @@
-import pokebase as pb
+import time
+from itertools import islice
+from pokeapi_client import create_default_client
+from ingestion_pipeline import Pipeline, Stage
+from datetime import datetime
+from sqlalchemy import insert, select, union
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from database import (
-    get_database_engine, create_tables, get_session,
-    Pokemon, PokemonEspecie, Ataque, Habilidad, Pokedex
+    get_engine, create_tables, session_scope,
+    Pokemon, PokemonEspecie, Ataque, Habilidad, Pokedex, IngestionCheckpoint,
+    pokemon_attacks, pokemon_abilities, pokemon_especie_tipo, stat_column_values
 )
 import json
+import threading
+from single_flight import SingleFlight
+from type_chart import TypeChart, guardar_relaciones
 
 class PokeAPILoader:
-    """Load Pokemon data from PokeAPI and store in database"""
-    
-    def __init__(self, db_path='pokemon.db'):
-        self.engine = get_database_engine(db_path)
-        create_tables(self.engine)
-        self.session = get_session(self.engine)
-        self.loaded_pokemon = set()
-    
-    def load_pokemon_species(self, pokemon_id, limit=10):
-        """Load Pokemon species data from PokeAPI and store in database"""
+    """Load Pokemon data from PokeAPI and store in database.
+
+    A `quiet` loader (e.g. a background writer) prints no schema messages
+    and does not fetch the type chart: species are stored with the matchups
+    of `type_chart` if one is shared, else without them until
+    update_type_matchups() runs.
+    """
+
+    def __init__(self, db_path='pokemon.db', client=None, max_workers=8, batch_size=50,
+                 transform_workers=2, verbose=True, profile='bulk-load', quiet=False, type_chart=None):
+        self.db_path = db_path
+        self.engine = get_engine(db_path, profile)
+        create_tables(self.engine, verbose=not quiet)
+        self.client = client or create_default_client()
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.transform_workers = transform_workers
+        self.verbose = verbose  # Per-Pokemon progress messages
+        self.db_time = 0.0
+        self._species_ids = {}
+        self._attack_ids = {}
+        self._ability_ids = {}
+        self._fetch_errors = {}
+        self._fetch_errors_lock = threading.Lock()
+        self.type_chart = type_chart  # Else loaded on the first load run (see _load_type_chart)
+        self._type_chart_error = 'not fetched by a quiet loader' if quiet and type_chart is None else None
+        # Ids already stored by this or any earlier (possibly interrupted) run
+        self.loaded_pokemon = self._read_checkpoint()
+        # Read once; the write path adds the ids it inserts, and a failed batch reloads them
+        self._preload_lookup_maps()
+
+    def fetch_documents(self, pokemon_id, resolver=None):
+        """Fetch stage: the raw Pokemon and species documents (network only, no DB access).
+
+        When a DetailResolver is given, the moves and abilities the Pokemon
+        needs are resolved through it as well.
+        """
+        pokemon_data = self.client.get('pokemon', pokemon_id)
         try:
-            pokemon_data = pb.pokemon(pokemon_id)
-            
-            if pokemon_data.id in self.loaded_pokemon:
-                print(f"Pokemon {pokemon_data.name} already in database, skipping...")
-                return
-            
-            # Extract species information
-            species_name = pokemon_data.species.name
-            pokemon_type = pokemon_data.types[0].type.name if pokemon_data.types else "normal"
-            altura = pokemon_data.height
-            peso = pokemon_data.weight
-            
-            # Get species details
-            try:
-                species = pb.pokemon_species(pokemon_data.species.name)
-                es_legendario = species.is_legendary
-                es_mitico = species.is_mythical
-                es_bebe = species.is_baby
-                generacion = species.generation.name if species.generation else "unknown"
-                habitat = species.habitat.name if species.habitat else "unknown"
-            except:
-                es_legendario = False
-                es_mitico = False
-                es_bebe = False
-                generacion = "unknown"
-                habitat = "unknown"
-            
-            # Check if species exists in database
-            especie_db = self.session.query(PokemonEspecie).filter_by(nombre=species_name).first()
-            if not especie_db:
-                especie_db = PokemonEspecie(
-                    nombre=species_name,
-                    tipo=pokemon_type,
-                    es_legendario=es_legendario,
-                    es_mitico=es_mitico,
-                    es_bebe=es_bebe,
-                    generacion=generacion,
-                    habitat=habitat,
-                    imagen=pokemon_data.sprites.front_default or "",
-                    atributos=self._extract_stats(pokemon_data),
-                    rango_genero=0.5
+            species = self.client.get('pokemon-species', pokemon_data['species']['name'])
+        except Exception as e:
+            if not _is_not_found(e):
+                raise  # Transient: record the Pokemon as failed so it is retried
+            species = None
+
+        if resolver is not None:
+            resolver.resolve('move', self._extract_moves(pokemon_data))
+            resolver.resolve('ability', self._extract_abilities(pokemon_data))
+        return {'pokemon': pokemon_data, 'species': species}
+
+    def build_record(self, documents, move_details, ability_details):
+        """Transform stage: turn fetched documents into a compact record to store"""
+        pokemon_data = documents['pokemon']
+        species = documents['species']
+        if species:
+            especie_info = {
+                'es_legendario': species['is_legendary'],
+                'es_mitico': species['is_mythical'],
+                'es_bebe': species['is_baby'],
+                'generacion': species['generation']['name'] if species.get('generation') else "unknown",
+                'habitat': species['habitat']['name'] if species.get('habitat') else "unknown"
+            }
+        else:
+            especie_info = {
+                'es_legendario': False,
+                'es_mitico': False,
+                'es_bebe': False,
+                'generacion': "unknown",
+                'habitat': "unknown"
+            }
+
+        return {
+            'id': pokemon_data['id'],
+            'name': pokemon_data['name'],
+            'species': pokemon_data['species']['name'],
+            'tipo': pokemon_data['types'][0]['type']['name'] if pokemon_data['types'] else "normal",
+            'tipos': [t['type']['name'] for t in pokemon_data['types']],
+            'altura': pokemon_data['height'],
+            'peso': pokemon_data['weight'],
+            'imagen': pokemon_data['sprites'].get('front_default') or "",
+            'atributos': self._extract_stats(pokemon_data),
+            'habilidades': self._extract_abilities(pokemon_data),
+            'ataques': self._extract_moves(pokemon_data),
+            'especie_info': especie_info,
+            'move_details': move_details,
+            'ability_details': ability_details
+        }
+
+    def fetch_pokemon(self, pokemon_id):
+        """Fetch and transform everything needed to store one Pokemon"""
+        resolver = DetailResolver(self._fetch_detail, self._is_known)
+        documents = self.fetch_documents(pokemon_id, resolver)
+        return self.build_record(documents, resolver.details['move'], resolver.details['ability'])
+
+    def store_pokemon(self, record):
+        """Store a fetched Pokemon record in the database"""
+        if record['id'] in self.loaded_pokemon:
+            if self.verbose:
+                print(f"Pokemon {record['name']} already in database, skipping...")
+            return False
+        return self.store_pokemon_batch([record]) == 1
+
+    def store_pokemon_batch(self, records):
+        """Store a chunk of fetched records in one transaction.
+
+        New species, moves and abilities are inserted with executemany
+        statements and resolved through the preloaded name->id maps, so no
+        per-row SELECT is issued. If the chunk fails, its records are retried
+        one by one so a single bad record does not lose the others.
+        Returns the number of Pokemon stored.
+        """
+        records = [r for r in records if r['id'] not in self.loaded_pokemon]
+        if not records:
+            return 0
+
+        started = time.perf_counter()
+        try:
+            with session_scope(self.engine) as session:
+                stored = self._write_batch(session, records)
+        except Exception as e:
+            self._preload_lookup_maps()
+            if len(records) == 1:
+                print(f"Error storing Pokemon {records[0]['name']}: {str(e)}")
+                self._record_failures({records[0]['id']: str(e)})
+                return 0
+            return sum(self.store_pokemon_batch([record]) for record in records)
+        finally:
+            self.db_time += time.perf_counter() - started
+
+        for record in records:
+            self.loaded_pokemon.add(record['id'])
+            if not self.verbose:
+                continue
+            if record['id'] in stored:
+                print(f"Loaded Pokemon: {record['name']} (ID: {record['id']})")
+            else:
+                print(f"Pokemon {record['name']} already in database, skipping...")
+        return len(stored)
+
+    def _write_batch(self, session, records):
+        """Insert the rows for `records` in `session` (caller commits). Returns the stored Pokemon ids."""
+        new_species = {}
+        new_species_types = {}
+        new_attacks = {}
+        new_abilities = {}
+        for record in records:
+            if record['species'] not in self._species_ids and record['species'] not in new_species:
+                new_species[record['species']] = dict(
+                    nombre=record['species'],
+                    tipo=record['tipo'],
+                    imagen=record['imagen'],
+                    atributos=record['atributos'],
+                    rango_genero=0.5,
+                    **record['especie_info']
                 )
-                self.session.add(especie_db)
-                self.session.commit()
-            
-            # Create Pokemon instance
-            pokemon_db = Pokemon(
-                id_pokemon=pokemon_data.id,
-                altura=altura,
-                peso=peso,
-                especie=species_name,
-                color=pokemon_type,
-                atributos=self._extract_stats(pokemon_data),
-                lista_habilidades=self._extract_abilities(pokemon_data),
-                lista_ataques=self._extract_moves(pokemon_data)
+                new_species_types[record['species']] = record.get('tipos') or [record['tipo']]
+            for move_name in record['ataques']:
+                details = record['move_details'].get(move_name)
+                if move_name not in self._attack_ids and details:
+                    new_attacks.setdefault(move_name, dict(nombre=move_name, **details))
+            for ability_name in record['habilidades']:
+                details = record['ability_details'].get(ability_name)
+                if ability_name not in self._ability_ids and details:
+                    new_abilities.setdefault(ability_name, dict(nombre=ability_name, **details))
+
+        if self.type_chart is not None and new_species:
+            # Weaknesses and resistances of the whole batch in one pass over the chart
+            relaciones = self.type_chart.relaciones([new_species_types[nombre] for nombre in new_species])
+            for row, (debiles, fuertes) in zip(new_species.values(), relaciones):
+                row.update(debil_contra=debiles, fuerte_contra=fuertes)
+
+        species_ids = self._insert_returning_ids(session, PokemonEspecie, list(new_species.values()))
+        attack_ids = self._insert_returning_ids(session, Ataque, list(new_attacks.values()))
+        ability_ids = self._insert_returning_ids(session, Habilidad, list(new_abilities.values()))
+        type_rows = [
+            {'especie_id': species_ids[nombre], 'slot': slot, 'tipo': tipo}
+            for nombre, tipos in new_species_types.items() if nombre in species_ids
+            for slot, tipo in enumerate(tipos, 1)
+        ]
+        if type_rows:
+            session.execute(pokemon_especie_tipo.insert(), type_rows)
+
+        pokemon_rows = [
+            dict(
+                id_pokemon=record['id'],
+                nombre=record['name'],
+                altura=record['altura'],
+                peso=record['peso'],
+                especie=record['species'],
+                color=record['tipo'],
+                atributos=record['atributos'],
+                lista_habilidades=record['habilidades'],
+                lista_ataques=record['ataques'],
+                tipos=record.get('tipos'),
+                **stat_column_values(record['atributos'])
             )
-            
-            # Add attacks
-            for move_data in pokemon_data.moves[:5]:  # Limit to 5 moves
-                move_name = move_data.move.name
-                ataque = self.session.query(Ataque).filter_by(nombre=move_name).first()
-                if not ataque:
-                    try:
-                        move_details = pb.move(move_name)
-                        ataque = Ataque(
-                            nombre=move_name,
-                            descripcion=move_details.effect_entries[0].effect if move_details.effect_entries else "",
-                            potencia=move_details.power or 0,
-                            precision=move_details.accuracy or 100,
-                            pp=move_details.pp or 0,
-                            tipo=move_details.type.name
-                        )
-                        self.session.add(ataque)
-                    except:
-                        continue
-                if ataque:
-                    pokemon_db.ataques.append(ataque)
-            
-            # Add abilities
-            for ability_data in pokemon_data.abilities:
-                ability_name = ability_data.ability.name
-                habilidad = self.session.query(Habilidad).filter_by(nombre=ability_name).first()
-                if not habilidad:
-                    try:
-                        ability_details = pb.ability(ability_name)
-                        habilidad = Habilidad(
-                            nombre=ability_name,
-                            descripcion=ability_details.effect_entries[0].effect if ability_details.effect_entries else "",
-                            efecto=ability_details.effect
-                        )
-                        self.session.add(habilidad)
-                    except:
-                        continue
-                if habilidad:
-                    pokemon_db.habilidades.append(habilidad)
-            
-            self.session.add(pokemon_db)
-            self.session.commit()
-            self.loaded_pokemon.add(pokemon_data.id)
-            
-            print(f"Loaded Pokemon: {pokemon_data.name} (ID: {pokemon_data.id})")
-            
+            for record in records
+        ]
+        # OR IGNORE skips Pokemon stored by an earlier run; they return no row
+        result = session.execute(
+            insert(Pokemon).prefix_with('OR IGNORE').returning(Pokemon.id, Pokemon.id_pokemon),
+            pokemon_rows
+        )
+        pokemon_pks = {id_pokemon: pk for pk, id_pokemon in result}
+
+        attack_links = []
+        ability_links = []
+        for record in records:
+            pk = pokemon_pks.get(record['id'])
+            if pk is None:
+                continue
+            for move_name in record['ataques']:
+                attack_id = self._attack_ids.get(move_name) or attack_ids.get(move_name)
+                if attack_id:
+                    attack_links.append({'pokemon_id': pk, 'attack_id': attack_id})
+            for ability_name in record['habilidades']:
+                ability_id = self._ability_ids.get(ability_name) or ability_ids.get(ability_name)
+                if ability_id:
+                    ability_links.append({'pokemon_id': pk, 'habilidad_id': ability_id})
+        if attack_links:
+            session.execute(pokemon_attacks.insert(), attack_links)
+        if ability_links:
+            session.execute(pokemon_abilities.insert(), ability_links)
+
+        # Checkpoint in the same transaction so it never disagrees with the data
+        self._mark_loaded(session, [record['id'] for record in records])
+
+        # Only publish new ids to the shared maps once the rows exist
+        self._species_ids.update(species_ids)
+        self._attack_ids.update(attack_ids)
+        self._ability_ids.update(ability_ids)
+        return set(pokemon_pks)
+
+    def _insert_returning_ids(self, session, model, rows):
+        """executemany INSERT of `rows` returning a nombre -> id map"""
+        if not rows:
+            return {}
+        result = session.execute(
+            insert(model).returning(model.id, model.nombre), rows
+        )
+        return {nombre: pk for pk, nombre in result}
+
+    def load_pokemon_species(self, pokemon_id, limit=10):
+        """Load Pokemon species data from PokeAPI and store in database"""
+        if pokemon_id in self.loaded_pokemon:
+            if self.verbose:
+                print(f"Pokemon {pokemon_id} already in database, skipping...")
+            return False
+        self._load_type_chart()
+        try:
+            record = self.fetch_pokemon(pokemon_id)
         except Exception as e:
             print(f"Error loading Pokemon {pokemon_id}: {str(e)}")
-            self.session.rollback()
-    
-    def load_pokemon_range(self, start=1, end=10):
-        """Load a range of Pokemon into the database"""
+            self._record_failures({pokemon_id: str(e)})
+            return False
+        return self.store_pokemon_batch([record]) == 1
+
+    def load_pokemon_range(self, start=1, end=10, max_workers=None, batch_size=None):
+        """Load a range of Pokemon into the database.
+
+        Ids already recorded in the ingestion checkpoint are skipped before
+        any network call, so an interrupted load resumes where it stopped.
+        See load_pokemon_ids for how the run is executed.
+        """
         print(f"Loading Pokemon {start} to {end} into database...")
-        for pokemon_id in range(start, end + 1):
-            self.load_pokemon_species(pokemon_id)
-        self.session.close()
-        print(f"Successfully loaded {len(self.loaded_pokemon)} Pokemon!")
-    
+        return self.load_pokemon_ids(range(start, end + 1), max_workers, batch_size)
+
+    def load_all_pokemon(self, max_workers=None, batch_size=None, chunk_size=200):
+        """Load every Pokemon the source lists (e.g. a LocalDumpSource).
+
+        Ids are streamed in chunks of `chunk_size`, so memory stays bounded
+        by the chunk rather than the dataset; moves and abilities stored by
+        earlier chunks are already in the lookup maps and are not re-read.
+        """
+        totals = {'loaded': 0, 'failed': 0, 'elapsed': 0.0, 'db_time': 0.0, 'api_calls': 0}
+        ids = self.client.iter_ids('pokemon')
+        while True:
+            chunk = list(islice(ids, chunk_size))
+            if not chunk:
+                break
+            result = self.load_pokemon_ids(chunk, max_workers, batch_size)
+            for key in totals:
+                totals[key] += result[key]
+            if result['interrupted']:
+                break
+        totals['pokemon_per_second'] = totals['loaded'] / totals['elapsed'] if totals['elapsed'] else 0.0
+        return totals
+
+    def retry_failed(self, max_workers=None, batch_size=None):
+        """Reload only the ids the checkpoint recorded as failed"""
+        failed_ids = self.get_failed_ids()
+        print(f"Retrying {len(failed_ids)} failed Pokemon...")
+        return self.load_pokemon_ids(failed_ids, max_workers, batch_size)
+
+    def load_pokemon_ids(self, pokemon_ids, max_workers=None, batch_size=None):
+        """Load the given Pokemon ids into the database.
+
+        Ingestion runs as a staged pipeline connected by bounded queues:
+        fetch (`max_workers` threads) -> transform (`transform_workers`
+        threads) -> persist (this thread, the single database writer, which
+        commits every `batch_size` records). Moves and abilities are fetched
+        exactly once per run by a shared DetailResolver. Returns the run's
+        throughput statistics, including per-stage metrics.
+        """
+        workers = max_workers or self.max_workers
+        batch_size = batch_size or self.batch_size
+        self._load_type_chart()
+        self.db_time = 0.0
+        self._fetch_errors = {}
+
+        pokemon_ids = [pid for pid in pokemon_ids if pid not in self.loaded_pokemon]
+        print(f"{len(pokemon_ids)} Pokemon to load ({workers} fetch workers)")
+        calls_before = self.client.calls
+        resolver = DetailResolver(self._fetch_detail, self._is_known)
+        batch = []
+        loaded = 0
+
+        def persist(record):
+            nonlocal batch, loaded
+            batch.append(record)
+            if len(batch) >= batch_size:
+                loaded += self.store_pokemon_batch(batch)
+                batch = []
+
+        pipeline = Pipeline(
+            [
+                Stage('fetch', lambda pid: self.fetch_documents(pid, resolver), workers),
+                Stage('transform', lambda docs: self.build_record(
+                    docs, resolver.details['move'], resolver.details['ability']
+                ), self.transform_workers)
+            ],
+            sink=Stage('persist', persist),
+            queue_size=workers * 2,
+            on_error=self._on_pipeline_error
+        )
+
+        interrupted = False
+        try:
+            pipeline.run(pokemon_ids)
+        except KeyboardInterrupt:
+            # Committed batches are already checkpointed; the rest is resumed next run
+            interrupted = True
+            pipeline.stop()
+            print("\nInterrupted! Progress so far is saved and will be resumed next time.")
+        if batch:
+            loaded += self.store_pokemon_batch(batch)
+        self._record_failures(self._fetch_errors)
+        if loaded:
+            self.publish()
+
+        failed = sum(1 for pid in pokemon_ids if pid not in self.loaded_pokemon)
+        elapsed = pipeline.wall_time
+        rate = loaded / elapsed if elapsed > 0 else 0.0
+        stages = pipeline.metrics()
+        print(f"Successfully loaded {loaded} Pokemon in {elapsed:.2f}s ({rate:.2f} Pokemon/s, "
+              f"{self.db_time:.2f}s writing to the database)")
+        self._print_stage_metrics(stages)
+        return {
+            'loaded': loaded,
+            'failed': failed,
+            'interrupted': interrupted,
+            'elapsed': elapsed,
+            'db_time': self.db_time,
+            'api_calls': self.client.calls - calls_before,
+            'pokemon_per_second': rate,
+            'latency_p50': pipeline.latency_percentile(50),
+            'latency_p99': pipeline.latency_percentile(99),
+            'stages': stages
+        }
+
+    def _load_type_chart(self):
+        """Fetch the type chart once; without it species are stored without matchups"""
+        if self.type_chart is not None or self._type_chart_error is not None:
+            return
+        try:
+            self.type_chart = TypeChart.from_source(self.client)
+        except Exception as e:
+            self._type_chart_error = str(e)
+            print(f"Type chart unavailable, weaknesses will not be stored: {e}")
+
+    def update_type_matchups(self):
+        """Recompute weaknesses and resistances of every stored species from the type chart"""
+        self._type_chart_error = None  # Retry a chart that failed to load earlier
+        self._load_type_chart()
+        if self.type_chart is None:
+            return 0
+        updated = guardar_relaciones(self.engine, self.type_chart)
+        self.publish()
+        return updated
+
+    def publish(self):
+        """Make newly stored Pokemon visible to readers of an in-memory snapshot, if one is served"""
+        from database_snapshot import reload_snapshot
+        return reload_snapshot(self.db_path)
+
+    def _on_pipeline_error(self, stage, item, error):
+        """Remember which id failed in a worker thread; the writer records it later"""
+        pokemon_id = item if stage == 'fetch' else item['pokemon']['id'] if stage == 'transform' else item['id']
+        print(f"Error loading Pokemon {pokemon_id} ({stage}): {str(error)}")
+        with self._fetch_errors_lock:
+            self._fetch_errors[pokemon_id] = f"{stage}: {error}"
+
+    def _print_stage_metrics(self, stages):
+        """Show where the run spent its time"""
+        print(f"{'Stage':<10} {'Workers':>7} {'Items':>6} {'Busy(s)':>8} {'Avg(ms)':>8} "
+              f"{'Util':>5} {'Queue max/avg':>14}")
+        for m in stages:
+            print(f"{m['stage']:<10} {m['workers']:>7} {m['processed']:>6} {m['busy_time']:>8.2f} "
+                  f"{m['avg_ms']:>8.1f} {m.get('utilization', 0):>5.0%} "
+                  f"{m['queue_depth_max']:>7}/{m['queue_depth_avg']:<6.1f}")
+
+    def _fetch_detail(self, endpoint, name):
+        """Fetch and transform one move or ability"""
+        data = self.client.get(endpoint, name)
+        if endpoint == 'move':
+            return self._extract_move_details(data)
+        return self._extract_ability_details(data)
+
+    def _is_known(self, endpoint, name):
+        """Whether a move/ability is already stored, so its details are not needed"""
+        return name in (self._attack_ids if endpoint == 'move' else self._ability_ids)
+
+    def get_failed_ids(self):
+        """Ids whose last ingestion attempt failed"""
+        with session_scope(self.engine) as session:
+            return [pid for (pid,) in session.query(IngestionCheckpoint.pokemon_id)
+                    .filter_by(estado='failed').order_by(IngestionCheckpoint.pokemon_id)]
+
+    def _read_checkpoint(self):
+        """Read every already-loaded id in one query.
+
+        Pokemon rows are included so databases filled before the checkpoint
+        table existed are resumed correctly too.
+        """
+        query = union(
+            select(IngestionCheckpoint.pokemon_id).where(IngestionCheckpoint.estado == 'loaded'),
+            select(Pokemon.id_pokemon).where(Pokemon.id_pokemon.isnot(None))
+        )
+        with session_scope(self.engine) as session:
+            return {pid for (pid,) in session.execute(query)}
+
+    def _mark_loaded(self, session, pokemon_ids):
+        """Upsert 'loaded' checkpoint rows in `session` (caller commits)"""
+        now = datetime.now().isoformat()
+        stmt = sqlite_insert(IngestionCheckpoint)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['pokemon_id'],
+            set_={'estado': 'loaded', 'error': None, 'actualizado': stmt.excluded.actualizado}
+        )
+        session.execute(stmt, [
+            {'pokemon_id': pid, 'estado': 'loaded', 'intentos': 1, 'actualizado': now}
+            for pid in pokemon_ids
+        ])
+
+    def _record_failures(self, errors):
+        """Upsert 'failed' checkpoint rows for targeted retry and commit them"""
+        if not errors:
+            return
+        now = datetime.now().isoformat()
+        stmt = sqlite_insert(IngestionCheckpoint)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['pokemon_id'],
+            set_={
+                'estado': 'failed',
+                'error': stmt.excluded.error,
+                'intentos': IngestionCheckpoint.intentos + 1,
+                'actualizado': stmt.excluded.actualizado
+            }
+        )
+        with session_scope(self.engine) as session:
+            session.execute(stmt, [
+                {'pokemon_id': pid, 'estado': 'failed', 'error': error, 'intentos': 1, 'actualizado': now}
+                for pid, error in errors.items()
+            ])
+
+    def _preload_lookup_maps(self):
+        """Read the species, move and ability name -> id maps in one query each"""
+        with session_scope(self.engine) as session:
+            self._species_ids = dict(session.query(PokemonEspecie.nombre, PokemonEspecie.id))
+            self._attack_ids = dict(session.query(Ataque.nombre, Ataque.id))
+            self._ability_ids = dict(session.query(Habilidad.nombre, Habilidad.id))
+
     def _extract_stats(self, pokemon_data):
         """Extract stats from Pokemon data"""
-        return {stat.stat.name: stat.base_stat for stat in pokemon_data.stats}
-    
+        return {stat['stat']['name']: stat['base_stat'] for stat in pokemon_data['stats']}
+
     def _extract_abilities(self, pokemon_data):
         """Extract abilities from Pokemon data"""
-        return [ability.ability.name for ability in pokemon_data.abilities]
-    
+        return [ability['ability']['name'] for ability in pokemon_data['abilities']]
+
     def _extract_moves(self, pokemon_data):
-        """Extract moves from Pokemon data"""
-        return [move.move.name for move in pokemon_data.moves[:10]]
+        """Extract the first 10 moves, the same list PokeAPIIntegration gives the domain model"""
+        return [move['move']['name'] for move in pokemon_data['moves'][:10]]
+
+    def _extract_move_details(self, move_data):
+        """Extract the Ataque columns from PokeAPI move data"""
+        return {
+            'descripcion': _english_entry(move_data.get('effect_entries', []), 'effect'),
+            'potencia': move_data.get('power') or 0,
+            'precision': move_data.get('accuracy') or 100,
+            'pp': move_data.get('pp') or 0,
+            'tipo': move_data['type']['name'] if move_data.get('type') else "unknown"
+        }
+
+    def _extract_ability_details(self, ability_data):
+        """Extract the Habilidad columns from PokeAPI ability data"""
+        entries = ability_data.get('effect_entries', [])
+        return {
+            'descripcion': _english_entry(entries, 'effect'),
+            'efecto': _english_entry(entries, 'short_effect')[:255]
+        }
+
+class DetailResolver:
+    """Run-wide, exactly-once resolution of move and ability details.
+
+    Every name is fetched by the first worker that needs it; concurrent
+    workers needing the same name share that fetch through a SingleFlight.
+    All records of the run share the resulting detail maps. A name PokeAPI
+    does not have is skipped when linking; any other failure is raised to
+    every worker waiting on it (so their Pokemon are recorded as failed and
+    retried) and the next worker needing the name fetches it again.
+    """
+
+    def __init__(self, fetch, is_known):
+        self.fetch = fetch
+        self.is_known = is_known
+        self.details = {'move': {}, 'ability': {}}
+        self.missing = {'move': set(), 'ability': set()}
+        self.flights = SingleFlight()
+
+    def resolve(self, endpoint, names):
+        for name in names:
+            if name in self.details[endpoint] or name in self.missing[endpoint]:
+                continue
+            if self.is_known(endpoint, name):
+                continue
+            try:
+                self.details[endpoint][name] = self.flights.do(
+                    (endpoint, name), lambda: self.fetch(endpoint, name)
+                )
+            except Exception as e:
+                if not _is_not_found(e):
+                    raise
+                self.missing[endpoint].add(name)
+
+def _is_not_found(error):
+    """Whether a fetch failed because the resource does not exist (not a transient error)"""
+    if isinstance(error, LookupError):
+        return True
+    response = getattr(error, 'response', None)
+    return response is not None and response.status_code == 404
+
+def _english_entry(entries, key):
+    """Return the English text of a PokeAPI effect entry list (first entry as fallback)"""
+    for entry in entries:
+        if entry.get('language', {}).get('name') == 'en':
+            return entry.get(key, "")
+    return entries[0].get(key, "") if entries else ""
@@ -1,69 +1,167 @@
-from database import get_database_engine, get_session, PokemonEspecie, Pokemon, Ataque, Habilidad
-from sqlalchemy import or_, and_
+from database import (
+    get_engine, session_scope, PokemonEspecie, Pokemon, Ataque, Habilidad,
+    pokemon_especie_tipo, pokemon_abilities, STAT_COLUMNS
+)
+from sqlalchemy import or_, and_, select, func
+from name_index import NameIndex
+from text_search import search_query
+from type_chart import formatear
 
 class PokedexManager:
     """Advanced Pokedex system with search and filtering"""
     
-    def __init__(self, db_path='pokemon.db'):
-        self.engine = get_database_engine(db_path)
-        self.session = get_session(self.engine)
+    def __init__(self, db_path='pokemon.db', profile='serving'):
+        self.engine = get_engine(db_path, profile)
     
     def search_by_name(self, nombre):
-        """Search Pokemon by name (partial match)"""
-        return self.session.query(PokemonEspecie).filter(
-            PokemonEspecie.nombre.ilike(f"%{nombre}%")
-        ).all()
+        """Search Pokemon by name (partial match), best match first"""
+        coincidencias = search_query(nombre, ['especie'], 'substring', 'nombre')
+        if coincidencias is None:
+            return []
+        coincidencias = coincidencias.subquery()
+        with session_scope(self.engine) as session:
+            return session.query(PokemonEspecie).join(
+                coincidencias, coincidencias.c.id == PokemonEspecie.id
+            ).order_by(coincidencias.c.rank).all()
+    
+    def search(self, texto, kinds=None, mode='prefix', limit=20):
+        """Ranked full-text search over species, moves and abilities.
+        
+        `kinds` restricts the results to 'especie', 'ataque' and/or
+        'habilidad'; `mode` is 'prefix', 'substring' or 'phrase' (see
+        text_search.match_expression). Returns dicts with kind, id, nombre,
+        descripcion and rank (lower is better).
+        """
+        query = search_query(texto, kinds, mode, limit=limit)
+        if query is None:
+            return []
+        with session_scope(self.engine) as session:
+            return [dict(fila._mapping) for fila in session.execute(query)]
     
     def search_by_type(self, tipo):
-        """Get all Pokemon of a specific type"""
-        return self.session.query(PokemonEspecie).filter_by(tipo=tipo.lower()).all()
+        """Get all Pokemon having a specific type in any slot"""
+        with session_scope(self.engine) as session:
+            return session.query(PokemonEspecie).join(
+                pokemon_especie_tipo, pokemon_especie_tipo.c.especie_id == PokemonEspecie.id
+            ).filter(pokemon_especie_tipo.c.tipo == tipo.lower()).order_by(PokemonEspecie.id).all()
+    
+    def search_by_types(self, tipos, match_all=True):
+        """Get Pokemon having all of `tipos` (e.g. fire + flying) or, with match_all=False, any of them"""
+        tipos = sorted({tipo.lower() for tipo in tipos})
+        with session_scope(self.engine) as session:
+            query = session.query(PokemonEspecie)
+            if match_all:
+                # One join per type; each is an index lookup on (tipo, especie_id) or the primary key
+                for tipo in tipos:
+                    relacion = pokemon_especie_tipo.alias()
+                    query = query.join(relacion, and_(
+                        relacion.c.especie_id == PokemonEspecie.id, relacion.c.tipo == tipo
+                    ))
+            else:
+                query = query.filter(PokemonEspecie.id.in_(
+                    select(pokemon_especie_tipo.c.especie_id).where(pokemon_especie_tipo.c.tipo.in_(tipos))
+                ))
+            return query.order_by(PokemonEspecie.id).all()
     
     def search_by_generation(self, generacion):
         """Get Pokemon from a specific generation"""
-        return self.session.query(PokemonEspecie).filter_by(generacion=generacion).all()
+        with session_scope(self.engine) as session:
+            return session.query(PokemonEspecie).filter_by(generacion=generacion).all()
     
     def get_legendary_pokemon(self):
         """Get all legendary Pokemon"""
-        return self.session.query(PokemonEspecie).filter_by(es_legendario=True).all()
+        with session_scope(self.engine) as session:
+            return session.query(PokemonEspecie).filter_by(es_legendario=True).all()
     
     def get_mythical_pokemon(self):
         """Get all mythical Pokemon"""
-        return self.session.query(PokemonEspecie).filter_by(es_mitico=True).all()
+        with session_scope(self.engine) as session:
+            return session.query(PokemonEspecie).filter_by(es_mitico=True).all()
     
     def get_baby_pokemon(self):
         """Get all baby Pokemon"""
-        return self.session.query(PokemonEspecie).filter_by(es_bebe=True).all()
+        with session_scope(self.engine) as session:
+            return session.query(PokemonEspecie).filter_by(es_bebe=True).all()
     
     def get_all_types(self):
         """Get list of all unique types in database"""
-        return self.session.query(PokemonEspecie.tipo).distinct().all()
+        with session_scope(self.engine) as session:
+            return session.query(pokemon_especie_tipo.c.tipo).distinct().order_by(pokemon_especie_tipo.c.tipo).all()
     
     def get_all_generations(self):
         """Get list of all unique generations in database"""
-        return self.session.query(PokemonEspecie.generacion).distinct().all()
+        with session_scope(self.engine) as session:
+            return session.query(PokemonEspecie.generacion).distinct().all()
+    
+    def suggest_names(self, nombre, n=3):
+        """Closest stored species names for a search without results"""
+        with session_scope(self.engine) as session:
+            nombres = [especie for (especie,) in session.query(PokemonEspecie.nombre)]
+        return NameIndex(nombres).sugerencias(nombre, n)
     
     def get_pokemon_count(self):
         """Get total count of Pokemon in Pokedex"""
-        return self.session.query(PokemonEspecie).count()
+        with session_scope(self.engine) as session:
+            return session.query(PokemonEspecie).count()
     
-    def get_pokemon_by_stat(self, stat_name, min_value=0, max_value=255):
-        """Search Pokemon by stat range"""
-        results = []
-        all_pokemon = self.session.query(Pokemon).all()
-        
-        for poke in all_pokemon:
-            if poke.atributos and stat_name in poke.atributos:
-                stat_value = poke.atributos[stat_name]
-                if min_value <= stat_value <= max_value:
-                    results.append(poke)
+    def get_pokemon_by_stat(self, stat_name, min_value=0, max_value=None):
+        """Search Pokemon by stat range (no upper bound by default), highest first"""
+        return self.get_pokemon_by_stats({stat_name: (min_value, max_value)}, order_by=stat_name)
+    
+    def get_pokemon_by_stats(self, ranges, order_by=None, descending=True, limit=None):
+        """Search Pokemon matching every {stat: (min, max)} range, optionally sorted by a stat.
         
-        return results
+        Stats are hp, attack, defense, special-attack, special-defense,
+        speed and total; unknown stat names match nothing. A max of None
+        leaves the range open at the top.
+        """
+        if any(stat not in STAT_COLUMNS for stat in ranges) or (order_by and order_by not in STAT_COLUMNS):
+            return []
+        with session_scope(self.engine) as session:
+            query = session.query(Pokemon)
+            for stat, (min_value, max_value) in ranges.items():
+                column = self._stat_column(stat)
+                if max_value is None:
+                    query = query.filter(column >= min_value)
+                else:
+                    query = query.filter(column.between(min_value, max_value))
+            if order_by:
+                column = self._stat_column(order_by)
+                query = query.order_by(column.desc() if descending else column.asc(), Pokemon.id_pokemon)
+            if limit:
+                query = query.limit(limit)
+            return query.all()
+    
+    def get_top_pokemon_by_stat(self, stat_name, limit=10):
+        """The `limit` Pokemon with the highest value of a stat"""
+        if stat_name not in STAT_COLUMNS:
+            return []
+        column = self._stat_column(stat_name)
+        with session_scope(self.engine) as session:
+            return session.query(Pokemon).filter(column.isnot(None)).order_by(
+                column.desc(), Pokemon.id_pokemon
+            ).limit(limit).all()
+    
+    def stat_column_name(self, stat_name):
+        """Pokemon attribute holding a stat, e.g. 'special-attack' -> 'stat_special_attack'"""
+        return STAT_COLUMNS[stat_name]
+    
+    def _stat_column(self, stat_name):
+        return getattr(Pokemon, STAT_COLUMNS[stat_name])
     
     def get_pokemon_by_ability(self, ability_name):
-        """Get all Pokemon with a specific ability"""
-        return self.session.query(Pokemon).join(
-            Pokemon.habilidades
-        ).filter(Habilidad.nombre.ilike(f"%{ability_name}%")).all()
+        """Get all Pokemon with an ability whose name contains `ability_name`, best match first"""
+        habilidades = search_query(ability_name, ['habilidad'], 'substring', 'nombre')
+        if habilidades is None:
+            return []
+        habilidades = habilidades.subquery()
+        with session_scope(self.engine) as session:
+            # One row per Pokemon, ranked by its best-matching ability
+            return session.query(Pokemon).join(
+                pokemon_abilities, pokemon_abilities.c.pokemon_id == Pokemon.id
+            ).join(
+                habilidades, habilidades.c.id == pokemon_abilities.c.habilidad_id
+            ).group_by(Pokemon.id).order_by(func.min(habilidades.c.rank), Pokemon.id).all()
     
     def display_pokemon_info(self, pokemon_especie):
         """Display detailed Pokemon information"""
@@ -83,11 +181,10 @@ Status:
   - Baby:       {pokemon_especie.es_bebe}
 
 Attributes:     {pokemon_especie.atributos}
-Weaknesses:     {pokemon_especie.debil_contra}
-Strong Against: {pokemon_especie.fuerte_contra}
+Weak to:        {formatear(pokemon_especie.debil_contra)}
+Resists/immune: {formatear(pokemon_especie.fuerte_contra)}
 """
         return info
     
     def close(self):
-        """Close database session"""
-        self.session.close()
+        """Nothing to release: every query closes its own session and the engine is shared"""
@@ -0,0 +1,157 @@
+"""
+Persistent on-disk cache for raw PokeAPI responses
+Entries are keyed by resource type and id/name, expire after a TTL and are
+evicted least-recently-used once the cache grows past its size budget
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = 'pokeapi_cache.db'
+DEFAULT_TTL = 30 * 24 * 3600  # PokeAPI data changes rarely; 30 days
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+class ResponseCache:
+    """SQLite-backed response cache with TTL, LRU eviction and hit/miss counters"""
+
+    # Pending last-access updates are written in one batch after this many hits
+    TOUCH_FLUSH_SIZE = 256
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_response_cache_last_access ON response_cache (last_access)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM response_cache"
+        ).fetchone()[0]
+
+    @staticmethod
+    def make_key(endpoint, id_or_name):
+        """Build the cache key for a resource, e.g. 'pokemon/25'"""
+        return f"{endpoint}/{str(id_or_name).strip().lower()}"
+
+    def get(self, endpoint, id_or_name, allow_stale=False):
+        """Return the cached document or None. Expired entries count as misses
+        unless `allow_stale` is set (offline replay)."""
+        key = self.make_key(endpoint, id_or_name)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            payload, expires_at = row
+            if expires_at is not None and expires_at < now and not allow_stale:
+                self.expired += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_FLUSH_SIZE:
+                self._flush_touched()
+        return json.loads(payload)
+
+    def put(self, endpoint, id_or_name, data, aliases=()):
+        """Store a document under its key and any alias ids/names"""
+        payload = json.dumps(data, separators=(',', ':'))
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        keys = {self.make_key(endpoint, k) for k in (id_or_name, *aliases) if k is not None}
+        with self._lock:
+            self._flush_touched()
+            for key in keys:
+                old = self._conn.execute(
+                    "SELECT size FROM response_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if old:
+                    self._total_bytes -= old[0]
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO response_cache "
+                    "(key, endpoint, payload, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, endpoint, payload, len(payload), expires_at, now)
+                )
+                self._total_bytes += len(payload)
+            self._evict()
+            self._conn.commit()
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'bytes': self._total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM response_cache")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def close(self):
+        """Flush pending bookkeeping and close the cache file"""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+    def _flush_touched(self):
+        """Write pending last-access times (caller holds the lock)"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE response_cache SET last_access = ? WHERE key = ?",
+                [(ts, key) for key, ts in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        """Drop least-recently-used entries until under budget (caller holds the lock)"""
+        while self.max_bytes and self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM response_cache ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.evictions += 1
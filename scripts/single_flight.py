@@ -0,0 +1,57 @@
+"""
+Single-flight request coalescing
+Concurrent callers asking for the same key share one in-flight call
+"""
+
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Run `func` once per key at a time; callers arriving meanwhile get the same result or error.
+
+    Nothing is remembered once a call finishes, so later callers start a
+    fresh call (caching is left to the response cache).
+    """
+
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            owner = call is None
+            if owner:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        """Executed calls, calls served by another caller's flight, and flights currently running"""
+        with self._lock:
+            return {'executions': self.executions, 'coalesced': self.coalesced, 'in_flight': len(self._calls)}
@@ -0,0 +1,70 @@
+"""
+FTS5 search over species, moves and abilities
+search_index (unicode61 words with prefix indexes) answers ranked word,
+prefix and phrase queries; search_index_trigram answers substring queries.
+Both are created and kept in sync by triggers in migrations.py.
+"""
+
+from sqlalchemy import column, literal_column, select, table
+
+# kind -> (source table, name column, text column, rowid offset). Index rowids
+# are source_id * 4 + offset, so triggers and joins find a row without a scan.
+SEARCH_SOURCES = {
+    'especie': ('pokemon_especie', 'nombre', 'habitat', 1),
+    'ataque': ('ataque', 'nombre', 'descripcion', 2),
+    'habilidad': ('habilidad', 'nombre', 'descripcion', 3),
+}
+SEARCH_MODES = ('prefix', 'substring', 'phrase')
+TRIGRAM_MIN_LENGTH = 3  # Trigram queries need at least one full trigram
+
+def _fts_table(name):
+    # Not part of Base.metadata: create_all() cannot create virtual tables
+    return table(name, column('rowid'), column('kind'), column('nombre'), column('descripcion'), column('rank'))
+
+search_index = _fts_table('search_index')
+search_index_trigram = _fts_table('search_index_trigram')
+
+def _quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+def match_expression(texto, mode='prefix', columna=None):
+    """(index, FTS5 query) for user text, or None when there is nothing to search.
+
+    prefix: every word must start a word of the document ("char" -> charizard)
+    substring: the text appears anywhere ("zard"); shorter than a trigram falls back to prefix
+    phrase: the words appear together in this order ("intense blast")
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode {mode!r}, expected one of {SEARCH_MODES}")
+    texto = str(texto).strip()
+    if not texto:
+        return None
+    if mode == 'substring' and len(texto) >= TRIGRAM_MIN_LENGTH:
+        index, query = search_index_trigram, _quote(texto)
+    elif mode == 'phrase':
+        index, query = search_index, _quote(texto)
+    else:
+        index, query = search_index, ' '.join(_quote(term) + '*' for term in texto.split())
+    if columna:
+        query = f"{columna} : ({query})"
+    return index, query
+
+def search_query(texto, kinds=None, mode='prefix', columna=None, limit=None):
+    """SELECT of (kind, id, nombre, descripcion, rank), best match first; None for empty text"""
+    expression = match_expression(texto, mode, columna)
+    if expression is None:
+        return None
+    index, query = expression
+    statement = select(
+        index.c.kind,
+        index.c.rowid.op('/')(4).label('id'),
+        index.c.nombre,
+        index.c.descripcion,
+        index.c.rank
+    ).where(literal_column(index.name).op('MATCH')(query))
+    if kinds:
+        statement = statement.where(index.c.kind.in_(list(kinds)))
+    statement = statement.order_by(index.c.rank)
+    if limit:
+        statement = statement.limit(limit)
+    return statement
@@ -0,0 +1,97 @@
+"""
+Type-effectiveness chart as a NumPy array
+Built once from the PokeAPI 'type' documents (PokeAPIClient or
+LocalDumpSource) and used to compute the weaknesses, resistances and
+immunities of many species in one vectorized pass
+"""
+
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from sqlalchemy import update
+from database import session_scope, PokemonEspecie, pokemon_especie_tipo
+
+# damage_relations key of the attacking type -> multiplier
+DAMAGE_RELATIONS = {'double_damage_to': 2.0, 'half_damage_to': 0.5, 'no_damage_to': 0.0}
+
+class TypeChart:
+    """`matriz[ataque, defensa]` is the multiplier of an attacking type against a defending type.
+
+    Types are kept in PokeAPI id order (normal, fighting, ... fairy); types
+    without damage relations (unknown, shadow, stellar) are left out.
+    """
+
+    def __init__(self, tipos: Sequence[str], matriz):
+        self.tipos = tuple(tipos)
+        self.indice = {tipo: posicion for posicion, tipo in enumerate(self.tipos)}
+        self.matriz = np.asarray(matriz, dtype=np.float32)
+        # Extra neutral column: padding and unknown types leave the product unchanged
+        self._extendida = np.hstack([self.matriz, np.ones((len(self.tipos), 1), dtype=np.float32)])
+
+    def __len__(self):
+        return len(self.tipos)
+
+    @classmethod
+    def from_source(cls, source) -> 'TypeChart':
+        """Chart from every 'type' document of a PokeAPIClient or LocalDumpSource"""
+        relaciones = {}
+        for nombre, _ in sorted(source.iter_names('type'), key=lambda item: item[1]):
+            damage = source.get('type', nombre).get('damage_relations') or {}
+            if any(damage.get(relacion) for relacion in DAMAGE_RELATIONS):
+                relaciones[nombre] = damage
+        indice = {tipo: posicion for posicion, tipo in enumerate(relaciones)}
+        matriz = np.ones((len(indice), len(indice)), dtype=np.float32)
+        for ataque, damage in relaciones.items():
+            for relacion, multiplicador in DAMAGE_RELATIONS.items():
+                for defensa in damage.get(relacion, []):
+                    if defensa['name'] in indice:
+                        matriz[indice[ataque], indice[defensa['name']]] = multiplicador
+        return cls(list(relaciones), matriz)
+
+    def multiplicadores(self, tipos_por_especie: Sequence[Sequence[str]]) -> np.ndarray:
+        """(species, attacking type) multipliers for each species' list of defending types"""
+        neutral = len(self.tipos)
+        ancho = max((len(tipos) for tipos in tipos_por_especie), default=0) or 1
+        indices = np.full((len(tipos_por_especie), ancho), neutral, dtype=np.intp)
+        for fila, tipos in enumerate(tipos_por_especie):
+            indices[fila, :len(tipos)] = [self.indice.get(tipo, neutral) for tipo in tipos]
+        # (attack, species, slot) -> product over the slots -> (species, attack)
+        return self._extendida[:, indices].prod(axis=2).T
+
+    def relaciones(self, tipos_por_especie: Sequence[Sequence[str]]) -> List[Tuple[Dict[str, float], Dict[str, float]]]:
+        """Per species: (weaknesses, resistances) as {attacking type: multiplier}.
+
+        Weaknesses are multipliers above 1; resistances are those below 1,
+        with 0 marking an immunity.
+        """
+        multiplicadores = self.multiplicadores(tipos_por_especie)
+        resultado = []
+        for fila in multiplicadores:
+            debiles = {self.tipos[i]: float(fila[i]) for i in np.flatnonzero(fila > 1)}
+            fuertes = {self.tipos[i]: float(fila[i]) for i in np.flatnonzero(fila < 1)}
+            resultado.append((debiles, fuertes))
+        return resultado
+
+def guardar_relaciones(engine, chart: TypeChart) -> int:
+    """Recompute debil_contra/fuerte_contra of every stored species. Returns the species updated."""
+    with session_scope(engine) as session:
+        filas = session.execute(
+            pokemon_especie_tipo.select().order_by(pokemon_especie_tipo.c.especie_id, pokemon_especie_tipo.c.slot)
+        ).all()
+        tipos_por_especie = {}
+        for especie_id, _, tipo in filas:
+            tipos_por_especie.setdefault(especie_id, []).append(tipo)
+        ids = list(tipos_por_especie)
+        relaciones = chart.relaciones([tipos_por_especie[especie_id] for especie_id in ids])
+        if ids:
+            session.execute(update(PokemonEspecie), [
+                {'id': especie_id, 'debil_contra': debiles, 'fuerte_contra': fuertes}
+                for especie_id, (debiles, fuertes) in zip(ids, relaciones)
+            ])
+    return len(ids)
+
+def formatear(relaciones) -> str:
+    """'ground x4, water x2' for a stored {type: multiplier} map"""
+    if not relaciones:
+        return "-"
+    ordenadas = sorted(relaciones.items(), key=lambda item: (-item[1], item[0]))
+    return ', '.join(f"{tipo} x{multiplicador:g}" for tipo, multiplicador in ordenadas)